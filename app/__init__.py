@@ -1,16 +1,30 @@
 # app/__init__.py
 
 import os
-import threading
 import time
+import atexit
+import threading
 import logging
-from flask import Flask, render_template
+import logging.handlers
+import queue
+from flask import Flask, render_template, make_response
 #from flask_sock import Sock
 from werkzeug.middleware.proxy_fix import ProxyFix
 from app.config import Config
-
-# Configure root logger - Use a simple format, prefixes will be added in messages
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+from app.version import __build__
+
+# Configure root logger - Use a simple format, prefixes will be added in messages.
+# Records are handed to a queue and written to the console by a listener thread, so job
+# threads emitting progress never block on stream I/O (or its handler lock).
+_log_handler = logging.StreamHandler()
+_log_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+_log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+_queue_handler = logging.handlers.QueueHandler(_log_queue)
+_queue_handler.setFormatter(logging.Formatter('%(message)s')) # Only merges args; the listener's handler formats
+logging.basicConfig(level=logging.INFO, handlers=[_queue_handler])
+_log_listener = logging.handlers.QueueListener(_log_queue, _log_handler, respect_handler_level=True)
+_log_listener.start()
+atexit.register(_log_listener.stop) # Drains pending records on exit
 
 # Reduce Werkzeug logging noise for cleaner output
 werkzeug_logger = logging.getLogger('werkzeug')
@@ -46,16 +60,29 @@ app.register_blueprint(auth_bp, url_prefix='/api')
 #from app.api import realtime_ws
 #realtime_ws.init_app(sock)
 
+# Cache-busting stamp appended to static asset URLs (long-lived browser cache, see
+# SEND_FILE_MAX_AGE_DEFAULT). Without a build stamp (dev), every restart gets a new one.
+ASSET_VERSION = __build__ or str(int(time.time()))
+
+@app.context_processor
+def inject_asset_version():
+    return {'asset_version': ASSET_VERSION}
+
 @app.route('/')
 def index():
     """Renders the main index page."""
     # Main upload workflow remains on the existing index page.
-    return render_template(
+    response = make_response(render_template(
         'index.html',
         default_api=app.config.get('DEFAULT_API'),
         default_language=app.config.get('DEFAULT_LANGUAGE'),
-        supported_languages=app.config.get('SUPPORTED_LANGUAGE_NAMES'),
-    )
+        # Only languages /transcribe accepts (codes disabled via SUPPORTED_LANGUAGE_CODES are hidden)
+        supported_languages={code: name for code, name in app.config.get('SUPPORTED_LANGUAGE_NAMES').items()
+                             if code == 'auto' or code in Config.SUPPORTED_LANGUAGE_CODE_SET},
+    ))
+    # The page itself must be revalidated so new asset URLs are picked up after a deploy
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
 
 # Version/info endpoints
 from app.api.version_info import version_bp
@@ -79,31 +106,67 @@ app.register_blueprint(version_bp, url_prefix='/api')
 # --- Background task for cleaning up old files ---
 from app.services.file_service import cleanup_old_files
 
+try:  # POSIX
+    import fcntl as _fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    _fcntl = None
+
+# Set at interpreter exit so the cleanup thread stops waiting instead of sleeping for hours
+_cleanup_shutdown = threading.Event()
+atexit.register(_cleanup_shutdown.set)
+
+def _try_cleanup_lock(lock_file) -> bool:
+    """Takes the cross-process cleanup lock without blocking (released when lock_file is closed).
+
+    Every Gunicorn worker runs a cleanup thread; only the one holding the lock sweeps, the
+    others skip that round instead of scanning the same directories concurrently.
+    """
+    if _fcntl is None:
+        return True # No locking available: sweep anyway (deletions tolerate races)
+    try:
+        _fcntl.flock(lock_file, _fcntl.LOCK_EX | _fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
 def run_cleanup_task():
-    """Periodically cleans up old files in the uploads directory."""
+    """Periodically cleans up old files in the uploads directory until shutdown is signalled."""
     # Give the app a moment to start up before the first run
-    time.sleep(15)
+    if _cleanup_shutdown.wait(15):
+        return
     worker_pid = os.getpid() # Get PID once
     logging.info(f"[SYSTEM:{worker_pid}] Cleanup thread started.")
 
+    # Interval between runs (default 6 hours); waiting on the shutdown event keeps it interruptible
+    sleep_interval = app.config.get('CLEANUP_INTERVAL', 21600)
     while True:
         try:
             # Need app context to access config
             with app.app_context():
                 upload_dir = app.config['TEMP_UPLOADS_DIR']
+                chunk_dir = app.config.get('CHUNK_TEMP_DIR', upload_dir)
                 threshold = app.config.get('DELETE_THRESHOLD', 24 * 60 * 60) # Default 24h
-                logging.info(f"[SYSTEM:{worker_pid}] Running periodic cleanup in '{upload_dir}' (threshold: {threshold}s)...")
-                # The cleanup_old_files function will log specifics about deleted files
-                deleted_count = cleanup_old_files(upload_dir, threshold)
-                logging.info(f"[SYSTEM:{worker_pid}] Cleanup task finished. Deleted {deleted_count} old file(s).")
+                lock_path = os.path.join(os.path.dirname(app.config['DATABASE']), 'cleanup.lock')
+                with open(lock_path, 'a') as lock_file:
+                    if not _try_cleanup_lock(lock_file):
+                        logging.debug(f"[SYSTEM:{worker_pid}] Cleanup already running in another worker; skipping this run.")
+                    else:
+                        logging.info(f"[SYSTEM:{worker_pid}] Running periodic cleanup in '{upload_dir}' (threshold: {threshold}s)...")
+                        # The cleanup_old_files function will log specifics about deleted files
+                        deleted_count = cleanup_old_files(upload_dir, threshold)
+                        if chunk_dir != upload_dir:
+                            # Chunks left behind by a crashed job on a separate chunk directory
+                            deleted_count += cleanup_old_files(chunk_dir, threshold)
+                        logging.info(f"[SYSTEM:{worker_pid}] Cleanup task finished. Deleted {deleted_count} old file(s).")
         except Exception as e:
             # Log exceptions occurring in the cleanup loop itself
             logging.error(f"[SYSTEM:{worker_pid}] Error during cleanup task loop: {e}", exc_info=True) # Include traceback
 
-        # Sleep for the configured interval (e.g., 6 hours)
-        sleep_interval = 21600 # 6 hours in seconds
         logging.debug(f"[SYSTEM:{worker_pid}] Cleanup thread sleeping for {sleep_interval} seconds.")
-        time.sleep(sleep_interval)
+        # Returns True (and ends the loop) as soon as shutdown is signalled
+        if _cleanup_shutdown.wait(sleep_interval):
+            break
+    logging.info(f"[SYSTEM:{worker_pid}] Cleanup thread stopped.")
 
 # Start the cleanup thread only if not already running (e.g., check a flag or use a lock if needed,
 # though Gunicorn often handles process management). Assuming one thread per worker process is intended.
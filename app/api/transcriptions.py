@@ -2,10 +2,12 @@
 
 import os
 import uuid
-import threading
+import hashlib
 import logging
+import time
+import threading
 import json # For parsing progress log from DB
-from flask import Blueprint, request, jsonify, current_app
+from flask import Blueprint, request, jsonify, current_app, Response, stream_with_context
 from werkzeug.utils import secure_filename
 from app.config import Config
 from app.services import transcription_service # Main service for processing
@@ -13,8 +15,50 @@ from app.services import file_service
 # Import the model directly for DB operations related to job status/retrieval
 from app.models import transcription as transcription_model
 
+try:
+    import orjson # C JSON encoder, much faster on the long transcription texts (optional)
+except ImportError:
+    orjson = None
+
 transcriptions_bp = Blueprint('transcriptions_bp', __name__)
 
+def jsonify_fast(obj) -> Response:
+    """Like jsonify, but serializes with orjson when it is installed."""
+    if orjson is None:
+        return jsonify(obj)
+    return Response(orjson.dumps(obj), mimetype='application/json')
+
+def _dumps_bytes(obj) -> bytes:
+    """Serializes one value to JSON bytes (orjson when installed)."""
+    if orjson is None:
+        return json.dumps(obj).encode('utf-8')
+    return orjson.dumps(obj)
+
+# Bytes collected before a streamed JSON array is written out (fewer, larger writes)
+JSON_STREAM_CHUNK_SIZE = 64 * 1024
+
+def _stream_json_array(records, on_done=None):
+    """Yields the JSON array of records piece by piece, never holding the whole body."""
+    buffer = bytearray(b'[')
+    count = 0
+    for record in records:
+        if count:
+            buffer += b','
+        buffer += _dumps_bytes(record)
+        count += 1
+        if len(buffer) >= JSON_STREAM_CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    buffer += b']'
+    yield bytes(buffer)
+    if on_done:
+        on_done(count)
+
+
+# Accepted form values, checked before the upload is saved (language codes lower-cased; 'auto' = detect)
+ALLOWED_LANGUAGES = Config.SUPPORTED_LANGUAGE_CODE_SET | {'auto'}
+ALLOWED_APIS = frozenset({'assemblyai', 'whisper', 'gpt4o', 'gemini'})
+
 # Logging is configured in __init__.py
 
 @transcriptions_bp.route('/transcribe', methods=['POST'])
@@ -23,151 +67,286 @@ def transcribe_audio():
     logging.info("[API] /transcribe endpoint called")
     if 'audio_file' not in request.files:
         logging.error("[API] No audio file provided in /transcribe request")
-        return jsonify({'error': 'No audio file provided'}), 400
+        return jsonify_fast({'error': 'No audio file provided'}), 400
     file = request.files['audio_file']
     if file.filename == '':
         logging.error("[API] No file selected in /transcribe form")
-        return jsonify({'error': 'No selected file'}), 400
+        return jsonify_fast({'error': 'No selected file'}), 400
     if not file_service.allowed_file(file.filename):
         logging.error(f"[API] File type not allowed: {file.filename}")
-        return jsonify({'error': 'File type not allowed'}), 400
+        return jsonify_fast({'error': 'File type not allowed'}), 400
+
+    # Get parameters from form and validate them before doing any work on the upload
+    # Normalized once; the API clients, the job record and the reuse lookup all get this value
+    language_code = request.form.get('language_code', Config.DEFAULT_LANGUAGE).strip().lower()
+    api_choice = request.form.get('api_choice', Config.DEFAULT_API)
+    context_prompt = request.form.get('context_prompt', '')
+    if language_code not in ALLOWED_LANGUAGES:
+        logging.error(f"[API] Unsupported language in /transcribe request: {language_code}")
+        return jsonify_fast({'error': f"Unsupported language: {language_code}"}), 400
+    if api_choice not in ALLOWED_APIS:
+        logging.error(f"[API] Unsupported API in /transcribe request: {api_choice}")
+        return jsonify_fast({'error': f"Unsupported transcription API: {api_choice}"}), 400
+
+    # Reject early (before saving the upload) if every worker is busy and the job queue is full
+    if not transcription_service.try_reserve_job_slot():
+        logging.warning("[API] Rejecting /transcribe request: all transcription workers are busy and the queue is full")
+        return jsonify_fast({'error': 'Too many transcription jobs in progress. Please try again later.'}), 429
 
     original_filename = secure_filename(file.filename)
-    job_id = str(uuid.uuid4()) # Generate unique ID for this job
+    job_id = uuid.uuid4().hex # Generate unique ID for this job (32 hex chars, URL-safe)
     short_job_id = job_id[:8] # For logging
 
     # Save the uploaded file temporarily
     upload_dir = Config.TEMP_UPLOADS_DIR
     os.makedirs(upload_dir, exist_ok=True)
-    # Include job_id in temp filename to avoid collisions
-    temp_filename = os.path.join(upload_dir, f"{job_id}_{original_filename}")
+    # Include job_id in temp filename to avoid collisions (upload_dir is absolute; the name has no separators)
+    temp_filename = f"{upload_dir}{os.sep}{job_id}_{original_filename}"
+    # Fingerprint of the upload for reusing an identical earlier job, hashed while it is saved
+    hasher = hashlib.sha256() if Config.DEDUPLICATE_UPLOADS else None
     try:
-        file.save(temp_filename)
+        file_service.save_upload(file.stream, temp_filename, hasher)
         # Log file saving in job context
         logging.info(f"[JOB:{short_job_id}] Saved temp upload: {os.path.basename(temp_filename)}")
     except Exception as e:
         # Log error with job context if possible, otherwise general API error
         logging.exception(f"[API:JOB:{short_job_id}] Failed to save uploaded file {os.path.basename(temp_filename)}: {e}")
-        return jsonify({'error': 'Failed to save uploaded file.'}), 500
-
-    # Get parameters from form
-    language_code = request.form.get('language_code', Config.DEFAULT_LANGUAGE)
-    api_choice = request.form.get('api_choice', Config.DEFAULT_API)
-    context_prompt = request.form.get('context_prompt', '')
-
+        transcription_service.release_job_slot()
+        return jsonify_fast({'error': 'Failed to save uploaded file.'}), 500
+
+    # Reject malformed/absurd audio headers before they reach ffmpeg on a worker
+    header_error = file_service.validate_audio_header(temp_filename)
+    if header_error:
+        logging.error(f"[JOB:{short_job_id}] Rejected upload '{original_filename}': {header_error}")
+        transcription_service.release_job_slot()
+        file_service.remove_files([temp_filename])
+        return jsonify_fast({'error': header_error}), 400
+
+    content_hash = None
+    if hasher is not None:
+        # The context prompt changes the result, so it is part of the fingerprint
+        hasher.update(b'\0' + context_prompt.encode('utf-8'))
+        content_hash = hasher.hexdigest()
+        if transcription_model.reuse_finished_transcription(job_id, original_filename, api_choice,
+                                                            content_hash, language_code):
+            logging.info(f"[JOB:{short_job_id}] Identical upload already transcribed; reused the earlier result.")
+            transcription_service.release_job_slot()
+            file_service.remove_files([temp_filename])
+            return jsonify_fast({'job_id': job_id, 'message': 'Identical upload already transcribed; reused the earlier result.'}), 202
+
+    submitted = False # Once submitted, the job releases its own slot
     try:
         # Create initial job record in the database (model function logs DB action)
         transcription_model.create_transcription_job(
             job_id=job_id,
             filename=original_filename,
-            api_used=api_choice
+            api_used=api_choice,
+            content_hash=content_hash,
+            language=language_code
         )
         logging.info(f"[JOB:{short_job_id}] Created job record for '{original_filename}'")
 
-        # Start the background processing thread
-        thread = threading.Thread(
-            target=transcription_service.process_transcription,
-            args=(job_id, temp_filename, language_code, api_choice, original_filename, context_prompt),
-            daemon=True # Allows app to exit even if threads are running
+        # Hand the job to the persistent transcription worker pool
+        transcription_service.submit_transcription(
+            job_id, temp_filename, language_code, api_choice, original_filename, context_prompt
         )
-        thread.start()
-        # Log thread start, service layer will log actual processing start
-        logging.info(f"[JOB:{short_job_id}] Background transcription thread started.")
+        submitted = True
+        # Log submission, service layer will log actual processing start
+        logging.info(f"[JOB:{short_job_id}] Transcription job queued on worker pool.")
 
         # Return job ID to the client for polling
-        return jsonify({'job_id': job_id, 'message': 'Transcription job started successfully.'}), 202 # Accepted
+        return jsonify_fast({'job_id': job_id, 'message': 'Transcription job started successfully.'}), 202 # Accepted
 
     except Exception as e:
         # Log error during job initiation phase
         logging.exception(f"[API:JOB:{short_job_id}] Error initiating transcription job: {e}")
+        if not submitted:
+            transcription_service.release_job_slot()
         # Attempt to clean up saved file if job creation failed
-        if os.path.exists(temp_filename):
-            try:
-                os.remove(temp_filename)
-                logging.info(f"[JOB:{short_job_id}] Cleaned up temp file {os.path.basename(temp_filename)} after initiation error.")
-            except OSError:
-                logging.error(f"[JOB:{short_job_id}] Failed to cleanup temp file {os.path.basename(temp_filename)} after error.")
-        return jsonify({'error': 'Failed to start transcription job.'}), 500
+        try:
+            os.unlink(temp_filename)
+            logging.info(f"[JOB:{short_job_id}] Cleaned up temp file {os.path.basename(temp_filename)} after initiation error.")
+        except FileNotFoundError:
+            pass
+        except OSError:
+            logging.error(f"[JOB:{short_job_id}] Failed to cleanup temp file {os.path.basename(temp_filename)} after error.")
+        return jsonify_fast({'error': 'Failed to start transcription job.'}), 500
+
+
+# Server-Sent Events: how often a stream re-reads a job running in another worker process
+# (same-process jobs wake it as soon as progress is flushed), how often an idle stream sends a
+# keep-alive comment, and how long one stream lives before the browser transparently
+# reconnects (resuming via Last-Event-ID) - well below the gunicorn worker timeout.
+SSE_POLL_INTERVAL = 0.5 # seconds
+SSE_HEARTBEAT_INTERVAL = 15 # seconds
+SSE_MAX_STREAM_SECONDS = 55
+
+# Under gthread every open stream holds one of the worker's request threads, so only
+# Config.SSE_MAX_STREAMS may be open per process; other watchers get 503 and the page polls
+# (0 disables streaming altogether)
+_sse_stream_slots = threading.BoundedSemaphore(max(Config.SSE_MAX_STREAMS, 0))
+
+def _build_progress_payload(job_id: str, job_data: dict, since: int = 0) -> dict:
+    """Builds the progress response for a job record (status, progress_log, error_message).
+    With since > 0 only the progress messages from that index on are included; 'next' is the
+    cursor to pass as since on the following request.
+    """
+    short_job_id = job_id[:8]
+    # Determine if finished based on status
+    is_finished = job_data['status'] in ('finished', 'error')
+    is_error = job_data['status'] == 'error'
+
+    # Parse progress log from JSON string
+    progress_log = []
+    if job_data['progress_log']:
+        try:
+            progress_log = json.loads(job_data['progress_log'])
+            if not isinstance(progress_log, list):
+                progress_log = [str(progress_log)] # Handle non-list JSON
+        except (json.JSONDecodeError, TypeError):
+            # Log parsing error with job context
+            logging.warning(f"[JOB:{short_job_id}] Could not parse progress log from DB. Content: {job_data['progress_log']}")
+            progress_log = ["Error parsing progress log."]
+
+    # Prepare response structure
+    response_data = {
+        'job_id': job_id,
+        'status': job_data['status'],
+        'progress': progress_log[since:] if since else progress_log,
+        'next': len(progress_log),
+        'finished': is_finished,
+        'error_message': job_data['error_message'] if is_error else None,
+        'result': None # Populate result only if finished successfully
+    }
+
+    if is_finished and not is_error:
+        # If finished successfully, only point to the record; the (possibly large) text is
+        # fetched once from /transcriptions/<id> instead of being carried by progress polls
+        response_data['result'] = {
+            'id': job_id,
+            'status': job_data['status']
+        }
+        logging.debug(f"[API:/progress] Job {short_job_id} finished successfully, returning result.")
+
+    elif is_error:
+         logging.debug(f"[API:/progress] Job {short_job_id} finished with error.")
+
+    else:
+         logging.debug(f"[API:/progress] Job {short_job_id} status: {job_data['status']}")
+
+    return response_data
 
 
 @transcriptions_bp.route('/progress/<job_id>', methods=['GET'])
 def get_progress(job_id):
-    """API endpoint to poll for job progress and results."""
+    """API endpoint to poll for job progress and results.
+
+    Pass ?since=<next from the previous response> to only receive the new progress messages.
+    """
     short_job_id = job_id[:8] # Use short ID for logging
+    since = max(request.args.get('since', 0, type=int), 0)
     logging.debug(f"[API:/progress] Progress check requested for job {short_job_id}") # Use debug for frequent checks
     try:
-        job_data = transcription_model.get_transcription_by_id(job_id) # Model logs DB access
+        # Poll with a narrow projection; the transcription text is never part of a progress response
+        job_data = transcription_model.get_job_progress(job_id) # Model logs DB access
 
         if not job_data:
             logging.warning(f"[API:/progress] Progress check failed: Job ID not found: {short_job_id}")
-            return jsonify({'error': 'Job not found'}), 404
-
-        # Determine if finished based on status
-        is_finished = job_data['status'] in ('finished', 'error')
-        is_error = job_data['status'] == 'error'
-
-        # Parse progress log from JSON string
-        progress_log = []
-        if job_data['progress_log']:
-            try:
-                progress_log = json.loads(job_data['progress_log'])
-                if not isinstance(progress_log, list):
-                    progress_log = [str(progress_log)] # Handle non-list JSON
-            except (json.JSONDecodeError, TypeError):
-                # Log parsing error with job context
-                logging.warning(f"[JOB:{short_job_id}] Could not parse progress log from DB. Content: {job_data['progress_log']}")
-                progress_log = ["Error parsing progress log."]
-
-        # Prepare response structure
-        response_data = {
-            'job_id': job_id,
-            'status': job_data['status'],
-            'progress': progress_log,
-            'finished': is_finished,
-            'error_message': job_data['error_message'] if is_error else None,
-            'result': None # Populate result only if finished successfully
-        }
-
-        if is_finished and not is_error:
-            # If finished successfully, populate the 'result' field
-            response_data['result'] = {
-                'id': job_data['id'],
-                'filename': job_data['filename'],
-                'detected_language': job_data['detected_language'],
-                'transcription_text': job_data['transcription_text'],
-                'api_used': job_data['api_used'],
-                'created_at': job_data['created_at'],
-                'status': job_data['status']
-            }
-            logging.debug(f"[API:/progress] Job {short_job_id} finished successfully, returning result.")
+            return jsonify_fast({'error': 'Job not found'}), 404
 
-        elif is_error:
-             logging.debug(f"[API:/progress] Job {short_job_id} finished with error.")
+        response_data = _build_progress_payload(job_id, job_data, since)
 
-        else:
-             logging.debug(f"[API:/progress] Job {short_job_id} status: {job_data['status']}")
-
-
-        return jsonify(response_data)
+        return jsonify_fast(response_data)
 
     except Exception as e:
         # Log error fetching progress with job context
         logging.exception(f"[API:/progress:JOB:{short_job_id}] Error fetching progress: {e}")
-        return jsonify({'error': 'Internal server error fetching job progress.'}), 500
+        return jsonify_fast({'error': 'Internal server error fetching job progress.'}), 500
+
+
+@transcriptions_bp.route('/progress/<job_id>/stream', methods=['GET'])
+def stream_progress(job_id):
+    """API endpoint streaming job progress as Server-Sent Events.
+
+    Each event carries only the new progress messages; its id is the number of messages
+    sent so far, so a reconnecting EventSource resumes via Last-Event-ID. The final state
+    is sent as an 'event: done' and ends the stream.
+    """
+    short_job_id = job_id[:8]
+    logging.debug(f"[API:/progress/stream] Progress stream requested for job {short_job_id}")
+    try:
+        sent = max(int(request.headers.get('Last-Event-ID', 0)), 0)
+    except ValueError:
+        sent = 0
+    job_data = transcription_model.get_job_progress(job_id)
+    if not job_data:
+        logging.warning(f"[API:/progress/stream] Progress stream failed: Job ID not found: {short_job_id}")
+        return jsonify_fast({'error': 'Job not found'}), 404
+    # A failed EventSource request (non-200) makes the page fall back to polling
+    if not _sse_stream_slots.acquire(blocking=False):
+        logging.info(f"[API:/progress/stream] Too many open progress streams; job {short_job_id} falls back to polling")
+        return jsonify_fast({'error': 'Too many progress streams open. Poll /api/progress instead.'}), 503
+
+    def generate(job_data, sent):
+        started = last_write = time.monotonic()
+        version = transcription_service.progress_version(job_id)
+        while True:
+            payload = _build_progress_payload(job_id, job_data, sent)
+            now = time.monotonic()
+            if payload['progress'] or payload['finished']:
+                sent = payload['next']
+                event = "event: done\n" if payload['finished'] else ""
+                yield f"id: {sent}\n{event}data: {_dumps_bytes(payload).decode('utf-8')}\n\n"
+                if payload['finished']:
+                    return
+                last_write = now
+            elif now - last_write >= SSE_HEARTBEAT_INTERVAL:
+                yield ": heartbeat\n\n"
+                last_write = now
+            if now - started >= SSE_MAX_STREAM_SECONDS:
+                return # The browser reconnects with Last-Event-ID
+            # Woken right away when the job runs in this process; otherwise re-read after the interval
+            version = transcription_service.wait_for_progress(job_id, version, SSE_POLL_INTERVAL)
+            job_data = transcription_model.get_job_progress(job_id)
+            if not job_data:
+                # Job deleted while streaming
+                gone = {'job_id': job_id, 'status': 'error', 'progress': [], 'finished': True,
+                        'error_message': 'Job not found', 'result': None}
+                yield f"event: done\ndata: {_dumps_bytes(gone).decode('utf-8')}\n\n"
+                return
+
+    try:
+        response = Response(stream_with_context(generate(job_data, sent)), mimetype='text/event-stream')
+    except Exception:
+        _sse_stream_slots.release()
+        raise
+    # Runs when the server closes the response (stream ended, client gone), even if the
+    # generator never started
+    response.call_on_close(_sse_stream_slots.release)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no' # Don't let a reverse proxy buffer the stream
+    return response
 
 
 @transcriptions_bp.route('/transcriptions', methods=['GET'])
 def get_transcriptions():
-    """API endpoint to get the list of all transcription records."""
+    """API endpoint to get the list of transcription records (all, or a page via ?limit=&offset=)."""
     logging.info("[API] /transcriptions GET endpoint called")
+    limit = request.args.get('limit', type=int)
+    offset = request.args.get('offset', 0, type=int)
+    if (limit is not None and limit < 0) or offset < 0:
+        logging.error(f"[API] Invalid pagination parameters: limit={limit}, offset={offset}")
+        return jsonify_fast({'error': 'limit and offset must be non-negative integers'}), 400
     try:
-        # Fetch all records from DB (model function logs DB access)
-        transcriptions = transcription_model.get_all_transcriptions()
-        logging.info(f"[API] Retrieved {len(transcriptions)} transcription records.")
-        return jsonify(transcriptions)
+        # Run the query now (errors still become a 500), then stream the rows out as they are read
+        transcriptions = transcription_model.iter_transcriptions(limit, offset)
+        def on_done(count):
+            logging.info(f"[API] Retrieved {count} transcription records.")
+        return Response(stream_with_context(_stream_json_array(transcriptions, on_done)),
+                        mimetype='application/json')
     except Exception as e:
         logging.exception("[API] Error fetching transcription history:")
-        return jsonify({'error': 'Failed to retrieve transcription history.'}), 500
+        return jsonify_fast({'error': 'Failed to retrieve transcription history.'}), 500
 
 
 @transcriptions_bp.route('/transcriptions/<transcription_id>', methods=['GET'])
@@ -180,13 +359,13 @@ def get_transcription(transcription_id):
         transcription = transcription_model.get_transcription_by_id(transcription_id)
         if not transcription:
              logging.warning(f"[API:JOB:{short_job_id}] Retrieve failed: Transcription not found.")
-             return jsonify({'error': 'Transcription not found'}), 404
+             return jsonify_fast({'error': 'Transcription not found'}), 404
         
         logging.info(f"[API] Retrieved {len(transcription)} transcription record.")
-        return jsonify(transcription)
+        return jsonify_fast(transcription)
     except Exception as e:
         logging.exception(f"[API:{short_job_id}] Error fetching transcription data:")
-        return jsonify({'error': 'Failed to retrieve transcription history.'}), 404
+        return jsonify_fast({'error': 'Failed to retrieve transcription history.'}), 404
 
 
 @transcriptions_bp.route('/transcriptions/<transcription_id>', methods=['DELETE'])
@@ -199,15 +378,15 @@ def delete_transcription(transcription_id):
         job_data = transcription_model.get_transcription_by_id(transcription_id) # Model logs DB access
         if not job_data:
              logging.warning(f"[API:JOB:{short_job_id}] Delete failed: Transcription not found.")
-             return jsonify({'error': 'Transcription not found'}), 404
+             return jsonify_fast({'error': 'Transcription not found'}), 404
 
         transcription_model.delete_transcription(transcription_id) # Model logs DB action
         # Note: This doesn't delete the original audio or transcription text files if saved elsewhere.
         logging.info(f"[API:JOB:{short_job_id}] Transcription deleted successfully.")
-        return jsonify({'message': 'Transcription deleted successfully'})
+        return jsonify_fast({'message': 'Transcription deleted successfully'})
     except Exception as e:
         logging.exception(f"[API:JOB:{short_job_id}] Error deleting transcription:")
-        return jsonify({'error': 'Failed to delete transcription.'}), 500
+        return jsonify_fast({'error': 'Failed to delete transcription.'}), 500
 
 
 @transcriptions_bp.route('/transcriptions/clear', methods=['DELETE'])
@@ -217,8 +396,8 @@ def clear_transcriptions():
     try:
         transcription_model.clear_transcriptions() # Model logs DB action
         logging.info("[API] All transcriptions cleared successfully.")
-        return jsonify({'message': 'All transcriptions cleared'})
+        return jsonify_fast({'message': 'All transcriptions cleared'})
     except Exception as e:
         logging.exception("[API] Error clearing all transcriptions:")
-        return jsonify({'error': 'Failed to clear all transcriptions.'}), 500
+        return jsonify_fast({'error': 'Failed to clear all transcriptions.'}), 500
 
@@ -28,16 +28,37 @@ class Config:
         'es': 'Spanish',
         'ru': 'Russian'
     }
+    # Lookup views of the two settings above for O(1) checks (codes/names lower-cased)
+    SUPPORTED_LANGUAGE_CODE_SET = frozenset(code.strip().lower() for code in SUPPORTED_LANGUAGE_CODES)
+    LANGUAGE_NAME_TO_CODE = {name.lower(): code for code, name in SUPPORTED_LANGUAGE_NAMES.items()}
     # Database file is stored in the database/ folder.
     DATABASE = os.path.join(os.getcwd(), 'database', 'transcriptions.db')
-    # Directory for temporary uploads.
-    TEMP_UPLOADS_DIR = os.path.join(os.getcwd(), 'uploads')
+    # Directory for temporary uploads (e.g. a tmpfs such as /dev/shm/transcriber_uploads to keep
+    # uploads off the disk; it must hold the largest upload plus its extracted audio).
+    TEMP_UPLOADS_DIR = os.path.abspath(os.environ.get('TEMP_UPLOADS_DIR') or os.path.join(os.getcwd(), 'uploads'))
+    # Directory for the chunk files of split long recordings. Defaults to TEMP_UPLOADS_DIR; point it
+    # at a tmpfs (e.g. /dev/shm) to keep chunk writes/re-reads off the disk.
+    CHUNK_TEMP_DIR = os.path.abspath(os.environ.get('CHUNK_TEMP_DIR') or TEMP_UPLOADS_DIR)
     # File deletion threshold in seconds (default: 24 hours)
     DELETE_THRESHOLD = 24 * 60 * 60
+    # Seconds between runs of the background cleanup of old uploads (default: 6 hours)
+    CLEANUP_INTERVAL = int(os.environ.get('CLEANUP_INTERVAL', str(6 * 60 * 60)))
     # Max concurrent chunk transcriptions for OpenAI calls
     OPENAI_MAX_CONCURRENCY = int(os.environ.get('OPENAI_MAX_CONCURRENCY', '4'))
     # Max concurrency for Gemini (defaults to same as OpenAI if not set)
     GEMINI_MAX_CONCURRENCY = int(os.environ.get('GEMINI_MAX_CONCURRENCY', OPENAI_MAX_CONCURRENCY if 'OPENAI_MAX_CONCURRENCY' in os.environ else '3'))
+    # Number of persistent worker threads that run transcription jobs (per process)
+    TRANSCRIPTION_WORKERS = int(os.environ.get('TRANSCRIPTION_WORKERS', '4'))
+    # Jobs that may wait for a free worker (per process) before uploads are rejected with 429
+    TRANSCRIPTION_MAX_QUEUE = int(os.environ.get('TRANSCRIPTION_MAX_QUEUE', '8'))
+    # Progress streams (SSE) open at once per process; each holds a request thread, so further
+    # watchers get 503 and poll instead (keep well below Gunicorn's --threads)
+    SSE_MAX_STREAMS = int(os.environ.get('SSE_MAX_STREAMS', '2'))
+    # Browser cache lifetime for /static assets in seconds (URLs carry a ?v= stamp that changes per build)
+    SEND_FILE_MAX_AGE_DEFAULT = int(os.environ.get('STATIC_MAX_AGE', '31536000'))
+    # Reuse the finished result of an identical earlier upload (same bytes, API, language and
+    # context prompt) instead of transcribing it again
+    DEDUPLICATE_UPLOADS = os.environ.get('DEDUPLICATE_UPLOADS', 'true').strip().lower() in ('1', 'true', 'yes')
 
 
 
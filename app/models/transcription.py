@@ -2,14 +2,25 @@
 
 import sqlite3
 import os
+import queue
+import threading
 import logging
 import json # For handling progress log
+from contextlib import contextmanager
 from flask import current_app, g
-from datetime import datetime, timezone
-from typing import Optional, Callable
+import time
+from typing import Optional, Callable, List, Iterator
 from app.version import __version__ as APP_VERSION, __build__ as APP_BUILD, version_string
 from app.models.version_patches import apply_patches_between
 
+def _utc_now_iso() -> str:
+    """Current UTC time as an ISO-8601 string with second precision, e.g. 2025-01-01T09:30:00Z.
+
+    Formats a single gmtime() reading directly instead of building an aware datetime,
+    rendering it and patching the offset.
+    """
+    return time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime())
+
 # --- Cross-platform file locking helpers ---
 try:  # POSIX
     import fcntl as _fcntl  # type: ignore
@@ -47,30 +58,89 @@ def _acquire_file_lock(lock_file) -> Callable[[], None]:
     # No locking available
     return lambda: None
 
-# --- Database Connection Handling (using Flask 'g') ---
+# --- Database Connection Handling (pooled connections, bound to Flask 'g') ---
+
+# Max number of idle connections kept open per process. Borrowing never blocks: when the
+# pool is empty a new connection is opened, and surplus connections are closed on return.
+DB_POOL_SIZE = 5
+# Prepared statements kept per connection (sqlite3's LRU statement cache)
+DB_STATEMENT_CACHE_SIZE = 256
+
+# Applied to every new connection. WAL itself is persistent in the database file and is
+# switched on once at startup (see _enable_wal), not on every connect.
+_CONNECTION_PRAGMAS = (
+    "PRAGMA synchronous=NORMAL",
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA mmap_size=268435456",
+    "PRAGMA cache_size=-20000", # ~20 MB page cache per connection (negative = KiB)
+    "PRAGMA busy_timeout=5000",
+)
+
+_pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=DB_POOL_SIZE)
+
+def _open_connection(db_path: str) -> sqlite3.Connection:
+    """Opens a pooled connection: autocommit mode, shareable across threads, tuned PRAGMAs."""
+    os.makedirs(os.path.dirname(db_path), exist_ok=True)
+    # The hot queries are module-level SQL constants, so with a statement cache sized well above
+    # their number each connection compiles every statement once and then only rebinds it.
+    conn = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, timeout=30,
+                           check_same_thread=False, isolation_level=None,
+                           cached_statements=DB_STATEMENT_CACHE_SIZE)
+    conn.row_factory = sqlite3.Row
+    for pragma in _CONNECTION_PRAGMAS:
+        conn.execute(pragma)
+    logging.debug("[DB] Database connection opened.")
+    return conn
+
+def _release_connection(conn: sqlite3.Connection) -> None:
+    """Returns a connection to the pool, closing it if the pool is already full."""
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        _pool.put_nowait(conn)
+    except queue.Full:
+        conn.close()
+        logging.debug("[DB] Database connection closed (pool full).")
+    except sqlite3.Error as e:
+        logging.warning(f"[DB] Discarding broken pooled connection: {e}")
+        conn.close()
+
+def _acquire_connection() -> sqlite3.Connection:
+    """Takes an idle connection from the pool, or opens a new one if none is idle."""
+    try:
+        return _pool.get_nowait()
+    except queue.Empty:
+        return _open_connection(current_app.config['DATABASE'])
 
 def get_db():
-    """Opens a new database connection if there is none yet for the current application context."""
+    """Returns the pooled connection bound to the current application context (borrowing one if needed)."""
     if 'db' not in g:
-        db_path = current_app.config['DATABASE']
         try:
-            os.makedirs(os.path.dirname(db_path), exist_ok=True)
-            g.db = sqlite3.connect(db_path, detect_types=sqlite3.PARSE_DECLTYPES, timeout=30)
-            g.db.row_factory = sqlite3.Row
-            logging.debug("[DB] Database connection opened.")
+            g.db = _acquire_connection()
         except sqlite3.Error as e:
             logging.error(f"[DB] Database connection error: {e}")
             raise
     return g.db
 
 def close_db(e=None):
-    """Closes the database connection at the end of the request."""
+    """Returns the context's connection to the pool at the end of the request."""
     db = g.pop('db', None)
     if db is not None:
-        db.close()
-        logging.debug("[DB] Database connection closed.")
+        _release_connection(db)
 
 # --- Database Initialization ---
+def _enable_wal(db_path: str) -> None:
+    """Switches the database file to WAL journaling (persistent; a no-op if already enabled).
+    WAL lets readers (progress polls, history list) run concurrently with the job threads
+    writing progress, and commits append to the log instead of syncing the main file.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        logging.info(f"[DB] Journal mode: {mode}")
+    finally:
+        conn.close()
+
 def init_db_command():
     """
     Initialize the database schema.
@@ -86,6 +156,7 @@ def init_db_command():
     with open(lock_path, 'w') as lock_file:
         releaser = _acquire_file_lock(lock_file)
         try:
+            _enable_wal(db_path)
             # Check if the 'transcriptions' table already exists.
             init_needed = True
             if os.path.exists(db_path):
@@ -123,7 +194,7 @@ def init_db_command():
                     ).fetchall()
                     meta = {k: v for (k, v) in rows}
 
-                    now_utc_iso = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+                    now_utc_iso = _utc_now_iso()
 
                     db_version = meta.get('app_version')
                     db_build = meta.get('app_build')
@@ -134,8 +205,9 @@ def init_db_command():
                         except Exception:
                             return tuple()
 
-                    # Case 1: No version and/or build yet — insert fresh values
+                    # Case 1: No version and/or build yet — apply all patches, then insert fresh values
                     if not db_version:
+                        apply_patches_between(conn, db_version, APP_VERSION)
                         cursor.execute(
                             """
                             INSERT INTO app_meta (key, value, updated_at) VALUES ('app_version', ?, ?)
@@ -231,11 +303,20 @@ def init_db_command():
                     created_at TEXT NOT NULL,
                     status TEXT DEFAULT 'pending',
                     progress_log TEXT DEFAULT '[]',
-                    error_message TEXT
+                    error_message TEXT,
+                    content_hash TEXT,
+                    language TEXT
                 )
                 '''
             )
             logging.info("[DB] 'transcriptions' table verified/created.")
+            # Keep in sync with the index patches in version_patches.py (fresh DBs skip patches)
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at_id ON transcriptions(created_at DESC, id DESC)"
+            )
+            conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_transcriptions_content ON transcriptions(content_hash, api_used, language)"
+            )
 
             # Ensure the app_meta table exists and seed version/build info at first init
             conn.execute(
@@ -247,7 +328,7 @@ def init_db_command():
                 )
                 '''
             )
-            now_utc_iso = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+            now_utc_iso = _utc_now_iso()
             cursor.execute(
                 """
                 INSERT INTO app_meta (key, value, updated_at) VALUES ('app_version', ?, ?)
@@ -277,44 +358,159 @@ def init_db_command():
 
 # --- CRUD and Job Status Operations ---
 
-def create_transcription_job(job_id: str, filename: str, api_used: str) -> None:
-    """Creates an initial record for a transcription job."""
+# Statements as module constants: every call passes sqlite3 the identical SQL text,
+# so the connection's statement cache serves a prepared statement instead of re-parsing.
+INSERT_JOB_SQL = '''
+    INSERT INTO transcriptions (id, filename, api_used, created_at, status, progress_log, error_message,
+                                content_hash, language)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    '''
+# Creates a finished job as a copy of the newest finished job for the same upload fingerprint
+INSERT_REUSED_JOB_SQL = '''
+    INSERT INTO transcriptions (id, filename, detected_language, transcription_text, api_used, created_at,
+                                status, progress_log, error_message, content_hash, language)
+    SELECT ?, ?, detected_language, transcription_text, api_used, ?, 'finished', ?, NULL, content_hash, language
+    FROM transcriptions
+    WHERE content_hash = ? AND api_used = ? AND language = ? AND status = 'finished'
+    ORDER BY created_at DESC
+    LIMIT 1
+    '''
+SELECT_PROGRESS_LOG_SQL = "SELECT progress_log FROM transcriptions WHERE id = ?"
+SELECT_JOB_SQL = "SELECT * FROM transcriptions WHERE id = ?"
+# The history list names its columns (no progress_log, which only progress polls need) and
+# breaks created_at ties (second precision) by id, so pages are stable; both are read in
+# idx_transcriptions_created_at_id order without a sort step.
+LIST_COLUMNS = "id, filename, detected_language, transcription_text, api_used, created_at, status, error_message"
+SELECT_ALL_SQL = f"SELECT {LIST_COLUMNS} FROM transcriptions ORDER BY created_at DESC, id DESC"
+SELECT_PAGE_SQL = f"SELECT {LIST_COLUMNS} FROM transcriptions ORDER BY created_at DESC, id DESC LIMIT ? OFFSET ?"
+DELETE_ONE_SQL = "DELETE FROM transcriptions WHERE id = ?"
+DELETE_ALL_SQL = "DELETE FROM transcriptions"
+SELECT_JOB_PROGRESS_SQL = "SELECT status, progress_log, error_message FROM transcriptions WHERE id = ?"
+UPDATE_PROGRESS_LOG_SQL = "UPDATE transcriptions SET progress_log = ? WHERE id = ?"
+# Appends one message to the JSON array in place (JSON1; '$[#]' would need SQLite 3.31+)
+APPEND_PROGRESS_SQL = (
+    "UPDATE transcriptions SET progress_log = "
+    "json_insert(progress_log, '$[' || json_array_length(progress_log) || ']', ?) WHERE id = ?"
+)
+UPDATE_STATUS_SQL = "UPDATE transcriptions SET status = ? WHERE id = ?"
+UPDATE_ERROR_SQL = "UPDATE transcriptions SET status = 'error', error_message = ? WHERE id = ?"
+UPDATE_SUCCESS_SQL = '''
+    UPDATE transcriptions
+    SET status = 'finished',
+        transcription_text = ?,
+        detected_language = ?,
+        error_message = NULL
+    WHERE id = ?
+    '''
+
+# SQLite allows one writer at a time. Writers of this process queue on this lock instead of
+# colliding on the database lock, where the loser sleeps in SQLite's busy handler (polling
+# with growing back-off) until busy_timeout; readers are never blocked by it (WAL).
+_writer_lock = threading.Lock()
+
+@contextmanager
+def _write_txn(db: sqlite3.Connection) -> Iterator[sqlite3.Connection]:
+    """Runs a group of writes as one BEGIN IMMEDIATE transaction (a single commit).
+
+    IMMEDIATE takes the write lock up front, so a read-modify-write inside the block
+    cannot be interleaved with another writer. Only one transaction per process is open
+    at a time (see _writer_lock).
+    """
+    with _writer_lock:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            yield db
+        except BaseException:
+            db.rollback()
+            raise
+        db.commit()
+
+# Progress appends are a read-modify-write of the JSON log, and the chunk threads of one
+# job report concurrently. Appends for the same job are serialized on a lock picked by
+# hashing the job ID, so unrelated jobs rarely contend.
+_PROGRESS_LOCK_SHARDS = 16 # Power of two
+_progress_locks = [threading.Lock() for _ in range(_PROGRESS_LOCK_SHARDS)]
+
+def _progress_lock(job_id: str) -> threading.Lock:
+    """Returns the lock shard guarding progress appends for a job."""
+    return _progress_locks[hash(job_id) & (_PROGRESS_LOCK_SHARDS - 1)]
+
+def _append_progress(db: sqlite3.Connection, job_id: str, messages: List[str]) -> bool:
+    """Appends messages to the JSON progress log. Caller provides the transaction. Returns False if the job is missing.
+
+    The batch is appended by SQLite itself (one executemany of APPEND_PROGRESS_SQL), so the
+    growing log is not read, parsed and rewritten by Python for every batch.
+    """
+    try:
+        return db.executemany(APPEND_PROGRESS_SQL, [(message, job_id) for message in messages]).rowcount > 0
+    except sqlite3.OperationalError as e:
+        # No JSON1 in this SQLite build, or a malformed log: rewrite the log from Python
+        logging.debug(f"[DB:JOB:{job_id[:8]}] In-place progress append unavailable ({e}); rewriting log.")
+    row = db.execute(SELECT_PROGRESS_LOG_SQL, (job_id,)).fetchone()
+    if not row:
+        return False
+    try:
+        current_log = json.loads(row['progress_log'])
+        if not isinstance(current_log, list):
+            current_log = []
+    except (json.JSONDecodeError, TypeError):
+        current_log = []
+    current_log.extend(messages)
+    db.execute(UPDATE_PROGRESS_LOG_SQL, (json.dumps(current_log), job_id))
+    return True
+
+def create_transcription_job(job_id: str, filename: str, api_used: str,
+                             content_hash: Optional[str] = None, language: Optional[str] = None) -> None:
+    """Creates an initial record for a transcription job.
+    content_hash/language identify the upload for reuse_finished_transcription (optional).
+    """
     short_job_id = job_id[:8]
-    sql = '''
-        INSERT INTO transcriptions (id, filename, api_used, created_at, status, progress_log, error_message)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-        '''
-    now_utc_iso = datetime.now(timezone.utc).replace(microsecond=0).isoformat().replace('+00:00', 'Z')
+    now_utc_iso = _utc_now_iso()
     initial_log = json.dumps(["Job created."])
     try:
         db = get_db()
-        db.execute(sql, (job_id, filename, api_used, now_utc_iso, 'pending', initial_log, None))
-        db.commit()
+        with _write_txn(db):
+            db.execute(INSERT_JOB_SQL, (job_id, filename, api_used, now_utc_iso, 'pending', initial_log, None,
+                                        content_hash, language))
         logging.info(f"[DB:JOB:{short_job_id}] Created initial job record.")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error creating job record: {e}")
         raise
 
+def reuse_finished_transcription(job_id: str, filename: str, api_used: str,
+                                 content_hash: str, language: str) -> bool:
+    """Creates job_id as an already finished copy of an earlier successful job for the same upload.
+
+    Lookup and insert are one statement (indexed on content_hash, api_used, language).
+    Returns False if there is no such job; nothing is written then.
+    """
+    short_job_id = job_id[:8]
+    log = json.dumps(["Job created.", "Identical upload already transcribed; reused the earlier result."])
+    try:
+        db = get_db()
+        with _write_txn(db):
+            cursor = db.execute(INSERT_REUSED_JOB_SQL, (job_id, filename, _utc_now_iso(), log,
+                                                        content_hash, api_used, language))
+        if cursor.rowcount:
+            logging.info(f"[DB:JOB:{short_job_id}] Created job record from an identical earlier upload.")
+            return True
+        return False
+    except sqlite3.Error as e:
+        logging.error(f"[DB:JOB:{short_job_id}] Error looking up an identical earlier upload: {e}")
+        return False
+
 def update_job_progress(job_id: str, message: str) -> None:
     """Appends a message to the job's progress log in the database."""
+    append_job_progress(job_id, [message])
+
+def append_job_progress(job_id: str, messages: List[str]) -> None:
+    """Appends a batch of messages to the job's progress log with a single read-modify-write."""
     short_job_id = job_id[:8]
     try:
         db = get_db()
-        cursor = db.cursor()
-        cursor.execute("SELECT progress_log FROM transcriptions WHERE id = ?", (job_id,))
-        row = cursor.fetchone()
-        if row:
-            try:
-                current_log = json.loads(row['progress_log'])
-                if not isinstance(current_log, list):
-                    current_log = []
-            except (json.JSONDecodeError, TypeError):
-                current_log = []
-            current_log.append(message)
-            new_log_json = json.dumps(current_log)
-            cursor.execute("UPDATE transcriptions SET progress_log = ? WHERE id = ?", (new_log_json, job_id))
-            db.commit()
-        else:
+        with _progress_lock(job_id), _write_txn(db):
+            found = _append_progress(db, job_id, messages)
+        if not found:
             logging.warning(f"[DB:JOB:{short_job_id}] Attempted to update DB progress for non-existent job.")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error updating DB progress log: {e}")
@@ -324,42 +520,32 @@ def update_job_status(job_id: str, status: str) -> None:
     short_job_id = job_id[:8]
     try:
         db = get_db()
-        db.execute("UPDATE transcriptions SET status = ? WHERE id = ?", (status, job_id))
-        db.commit()
+        with _write_txn(db):
+            db.execute(UPDATE_STATUS_SQL, (status, job_id))
         logging.info(f"[DB:JOB:{short_job_id}] Updated status to: {status}")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error updating status: {e}")
 
 def set_job_error(job_id: str, error_message: str) -> None:
-    """Sets the job status to 'error' and records the error message."""
+    """Sets the job status to 'error' and records the error message (one transaction)."""
     short_job_id = job_id[:8]
     try:
         db = get_db()
-        update_job_progress(job_id, f"ERROR: {error_message}")
-        db.execute("UPDATE transcriptions SET status = 'error', error_message = ? WHERE id = ?", (error_message, job_id))
-        db.commit()
+        with _progress_lock(job_id), _write_txn(db):
+            _append_progress(db, job_id, [f"ERROR: {error_message}"])
+            db.execute(UPDATE_ERROR_SQL, (error_message, job_id))
         logging.error(f"[DB:JOB:{short_job_id}] Set error status. Message: {error_message}")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error setting error status: {e}")
 
 def finalize_job_success(job_id: str, transcription_text: str, detected_language: str) -> None:
-    """Finalizes a job as successful and saves the results."""
+    """Finalizes a job as successful and saves the results (one transaction)."""
     short_job_id = job_id[:8]
     try:
         db = get_db()
-        update_job_progress(job_id, "Transcription successful and saved.")
-        db.execute(
-            """
-            UPDATE transcriptions
-            SET status = 'finished',
-                transcription_text = ?,
-                detected_language = ?,
-                error_message = NULL
-            WHERE id = ?
-            """,
-            (transcription_text, detected_language, job_id)
-        )
-        db.commit()
+        with _progress_lock(job_id), _write_txn(db):
+            _append_progress(db, job_id, ["Transcription successful and saved."])
+            db.execute(UPDATE_SUCCESS_SQL, (transcription_text, detected_language, job_id))
         logging.info(f"[DB:JOB:{short_job_id}] Finalized job successfully.")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error finalizing successful job: {e}")
@@ -370,20 +556,46 @@ def get_transcription_by_id(transcription_id: str) -> Optional[dict]:
     short_job_id = transcription_id[:8]
     try:
         db = get_db()
-        transcription = db.execute('SELECT * FROM transcriptions WHERE id = ?', (transcription_id,)).fetchone()
+        transcription = db.execute(SELECT_JOB_SQL, (transcription_id,)).fetchone()
         logging.debug(f"[DB:JOB:{short_job_id}] Retrieved job record by ID.")
         return dict(transcription) if transcription else None
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error retrieving transcription by ID: {e}")
         return None
 
-def get_all_transcriptions() -> list[dict]:
-    """Retrieves all completed transcriptions ordered by creation date."""
+def get_job_progress(job_id: str) -> Optional[dict]:
+    """Retrieves only the columns needed to report job progress (no transcription text)."""
+    short_job_id = job_id[:8]
     try:
         db = get_db()
-        transcriptions = db.execute('SELECT * FROM transcriptions ORDER BY created_at DESC').fetchall()
+        row = db.execute(SELECT_JOB_PROGRESS_SQL, (job_id,)).fetchone()
+        logging.debug(f"[DB:JOB:{short_job_id}] Retrieved job progress.")
+        return dict(row) if row else None
+    except sqlite3.Error as e:
+        logging.error(f"[DB:JOB:{short_job_id}] Error retrieving job progress: {e}")
+        return None
+
+def iter_transcriptions(limit: Optional[int] = None, offset: int = 0) -> Iterator[dict]:
+    """Runs the history query (newest first, optionally one page) and returns an iterator of records.
+
+    The query is executed here, so errors raise immediately; rows are then stepped out of
+    SQLite one at a time as the iterator is consumed instead of being fetched into a list.
+    Pages are read straight off the created_at index, so no sort step is needed.
+    """
+    db = get_db()
+    if limit is None and not offset:
+        cursor = db.execute(SELECT_ALL_SQL)
+    else:
+        # LIMIT -1 means "no limit" in SQLite (offset without limit)
+        cursor = db.execute(SELECT_PAGE_SQL, (-1 if limit is None else limit, offset))
+    return (dict(row) for row in cursor)
+
+def get_all_transcriptions(limit: Optional[int] = None, offset: int = 0) -> list[dict]:
+    """Retrieves transcriptions ordered by creation date (newest first), optionally one page."""
+    try:
+        transcriptions = list(iter_transcriptions(limit, offset))
         logging.debug(f"[DB] Retrieved {len(transcriptions)} total transcription records.")
-        return [dict(row) for row in transcriptions]
+        return transcriptions
     except sqlite3.Error as e:
         logging.error(f"[DB] Error retrieving all transcriptions: {e}")
         return []
@@ -393,8 +605,8 @@ def delete_transcription(transcription_id: str) -> None:
     short_job_id = transcription_id[:8]
     try:
         db = get_db()
-        db.execute('DELETE FROM transcriptions WHERE id = ?', (transcription_id,))
-        db.commit()
+        with _write_txn(db):
+            db.execute(DELETE_ONE_SQL, (transcription_id,))
         logging.info(f"[DB:JOB:{short_job_id}] Deleted transcription record.")
     except sqlite3.Error as e:
         logging.error(f"[DB:JOB:{short_job_id}] Error deleting transcription record: {e}")
@@ -404,8 +616,8 @@ def clear_transcriptions() -> None:
     """Deletes all transcription records from the database."""
     try:
         db = get_db()
-        db.execute('DELETE FROM transcriptions')
-        db.commit()
+        with _write_txn(db):
+            db.execute(DELETE_ALL_SQL)
         logging.info("[DB] Cleared all transcription records.")
     except sqlite3.Error as e:
         logging.error(f"[DB] Error clearing all transcriptions: {e}")
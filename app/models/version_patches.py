@@ -15,11 +15,17 @@ class PatchStep:
 # Registry mapping version string -> ordered list of PatchStep
 # Define your DB schema/data migrations here. Keep versions in ascending order.
 PATCHES: Dict[str, List[PatchStep]] = {
-    # Example (uncomment and adjust when needed):
-    # "0.1.1": [
-    #     PatchStep(1, "ALTER TABLE transcriptions ADD COLUMN duration_seconds REAL", "Add duration column"),
-    #     PatchStep(2, "CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at ON transcriptions(created_at)", "Index on created_at"),
-    # ],
+    # Example step: PatchStep(1, "ALTER TABLE transcriptions ADD COLUMN duration_seconds REAL", "Add duration column")
+    "0.1.1": [
+        PatchStep(1, "CREATE INDEX IF NOT EXISTS idx_transcriptions_created_at_id ON transcriptions(created_at DESC, id DESC)",
+                  "Index on (created_at, id) for the history list (ORDER BY created_at DESC, id DESC)"),
+        PatchStep(2, "ALTER TABLE transcriptions ADD COLUMN content_hash TEXT",
+                  "Fingerprint of the upload (file bytes + context prompt) for reusing results"),
+        PatchStep(3, "ALTER TABLE transcriptions ADD COLUMN language TEXT",
+                  "Requested language code of the job"),
+        PatchStep(4, "CREATE INDEX IF NOT EXISTS idx_transcriptions_content ON transcriptions(content_hash, api_used, language)",
+                  "Index for finding an earlier job with the same upload"),
+    ],
 }
 
 
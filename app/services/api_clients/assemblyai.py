@@ -70,7 +70,7 @@ class AssemblyAITranscriptionAPI:
                 # SIMPLE UI Message for language setting
                 if progress_callback: progress_callback("Language detection enabled.", False)
                 logging.info(f"{log_prefix} Language detection enabled.") # Console log
-            elif language_code in Config.SUPPORTED_LANGUAGE_CODES:
+            elif language_code in Config.SUPPORTED_LANGUAGE_CODE_SET:
                 config_params['language_code'] = language_code
                 # SIMPLE UI Message for language setting
                 if progress_callback: progress_callback(f"Language set to '{language_code}'.", False)
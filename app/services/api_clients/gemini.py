@@ -147,14 +147,16 @@ class GeminiTranscriptionAPI:
         final_language_used = None
 
         try:
-            if not os.path.exists(audio_file_path):
+            # A single stat() checks existence and gets the size
+            try:
+                file_size = os.stat(audio_file_path).st_size
+            except FileNotFoundError:
                 msg = f"ERROR: Audio file not found at path: {audio_file_path}"
                 if progress_callback:
                     progress_callback(msg, True)
                 logging.error(f"{log_prefix} {msg}")
                 return None, None
 
-            file_size = os.path.getsize(audio_file_path)
             file_length = file_service.get_audio_file_length(audio_file_path)
 
             # Use same limits and behavior as GPT-4o client for consistency
@@ -168,10 +170,9 @@ class GeminiTranscriptionAPI:
             else:
                 logging.info(f"{log_prefix} File within limits. Processing as single file.")
                 # Single file transcription
-                abs_path = os.path.abspath(audio_file_path)
-                temp_dir = os.path.dirname(abs_path)
+                abs_path = audio_file_path  # Already built under Config.TEMP_UPLOADS_DIR (absolute)
                 # Validate path is within expected temp dir
-                if not file_service.validate_file_path(abs_path, temp_dir):
+                if not file_service.validate_file_path(abs_path, Config.TEMP_UPLOADS_DIR):
                     msg = f"ERROR: Audio file path is not allowed or outside expected directory: {abs_path}"
                     if progress_callback: progress_callback(msg, True)
                     logging.error(f"{log_prefix} {msg}")
@@ -254,7 +255,7 @@ class GeminiTranscriptionAPI:
         requested_language = language_code
         log_prefix = f"[{self.API_NAME}:{display_filename or os.path.basename(audio_file_path)}]"
 
-        temp_dir = os.path.dirname(audio_file_path)
+        temp_dir = Config.CHUNK_TEMP_DIR # Chunks may live on a tmpfs, away from the upload
         chunk_files = []
         final_language_used = None
 
@@ -262,6 +263,9 @@ class GeminiTranscriptionAPI:
             chunk_files = file_service.split_audio_file(audio_file_path, temp_dir, progress_callback)
             if not chunk_files or len(chunk_files) == 0:
                 raise Exception("Audio splitting failed or resulted in no chunks.")
+            # Validate the chunk paths once here; the per-chunk transcription helper trusts them
+            if not all(file_service.validate_file_path(path, temp_dir) for path in chunk_files):
+                raise Exception("Audio splitting produced chunk files outside the chunk directory.")
 
             total_chunks = len(chunk_files)
             logging.info(f"{log_prefix} Starting transcription of {total_chunks} chunks...")
@@ -312,6 +316,10 @@ class GeminiTranscriptionAPI:
                         progress_callback(f"Transcribing {min(max_workers, total_chunks)} chunks in parallel. Already transcribed: {chunk_compl}/{total_chunks}.", False,)
                     logging.info(f"{log_prefix}:Chunk{chunk_num} Transcription successful.")
 
+                if error is not None:
+                    # Fail fast: drop chunks that have not started instead of uploading them for nothing
+                    executor.shutdown(wait=True, cancel_futures=True)
+
             if error is not None or any(r is None for r in results):
                 raise Exception(str(error) if error else "One or more chunks failed to transcribe.")
 
@@ -341,10 +349,10 @@ class GeminiTranscriptionAPI:
             return None, None
         finally:
             if chunk_files:
-                if progress_callback: progress_callback("Cleaning up temporary chunk files...", False)
-                removed_count = file_service.remove_files(chunk_files)
-                logging.info(f"{log_prefix} Cleaned up {removed_count} temporary chunk file(s).")
-                if progress_callback: progress_callback(f"Cleaned up {removed_count} temporary chunk file(s).", False)
+                # Deleted by the background unlink thread; the result does not wait for it
+                queued_count = file_service.remove_files_in_background(chunk_files)
+                logging.info(f"{log_prefix} Queued {queued_count} temporary chunk file(s) for cleanup.")
+                if progress_callback: progress_callback(f"Cleaning up {queued_count} temporary chunk file(s) in the background.", False)
 
 
     def _transcribe_single_chunk_with_retry(
@@ -370,14 +378,8 @@ class GeminiTranscriptionAPI:
 
         for attempt in range(max_retries):
             try:
-                abs_chunk_path = os.path.abspath(chunk_path)
-                temp_dir = os.path.dirname(abs_chunk_path)
-                if not file_service.validate_file_path(abs_chunk_path, temp_dir):
-                    msg = f"Chunk file path is not allowed: {abs_chunk_path}"
-                    logging.error(f"{effective_log_prefix} {msg}")
-                    raise ValueError(msg)
-
-                with open(abs_chunk_path, "rb") as audio_file:
+                abs_chunk_path = chunk_path  # Absolute, validated by the caller (upload or chunk dir)
+                with open(abs_chunk_path, "rb", buffering=file_service.UPLOAD_COPY_BUFFER_SIZE) as audio_file:
                     audio_bytes = audio_file.read()
 
                 mime_type = _guess_mime_type(abs_chunk_path)
@@ -0,0 +1,32 @@
+# app/services/api_clients/openai_client.py
+
+import logging
+from functools import lru_cache
+import httpx
+from openai import OpenAI, DefaultHttpxClient
+
+try:
+    import h2  # noqa: F401 - httpx needs it for HTTP/2
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Connection pool of the shared client: enough idle keep-alive connections for the parallel
+# chunk uploads of several concurrent jobs (OPENAI_MAX_CONCURRENCY threads each)
+HTTP_POOL_LIMITS = httpx.Limits(max_keepalive_connections=16, max_connections=32)
+
+
+@lru_cache(maxsize=4)
+def get_openai_client(api_key: str) -> OpenAI:
+    """
+    Returns the process-wide OpenAI client for an API key, creating it on first use.
+    The client is thread-safe and owns an HTTP connection pool, so sharing it across
+    API instances, jobs and parallel chunk threads keeps connections alive instead of
+    paying a new TCP/TLS handshake per job.
+    With HTTP/2 available, parallel chunk uploads are multiplexed over one connection.
+    """
+    http_client = DefaultHttpxClient(http2=HTTP2_AVAILABLE, limits=HTTP_POOL_LIMITS)
+    client = OpenAI(api_key=api_key, http_client=http_client)
+    # Console log only
+    logging.info(f"[OpenAI] Shared client created (HTTP/2: {'on' if HTTP2_AVAILABLE else 'off'}).")
+    return client
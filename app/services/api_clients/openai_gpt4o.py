@@ -3,10 +3,12 @@
 import os
 import logging
 import time
+import random
 from typing import Tuple, Optional, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from openai import OpenAI, OpenAIError, APIError, APIConnectionError, RateLimitError
+from openai import OpenAIError, APIError, APIConnectionError, RateLimitError
 from app.services import file_service
+from app.services.api_clients.openai_client import get_openai_client
 from app.config import Config
 
 # Raised when a JSON response hits the text token limit and we want to retry
@@ -33,7 +35,8 @@ class OpenAIGPT4oTranscriptionAPI:
             raise ValueError("OpenAI API key is required.")
         self.api_key = api_key
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # Reuse the process-wide client (and its connection pool)
+            self.client = get_openai_client(self.api_key)
             # Log successful initialization (console only)
             logging.info(f"[{self.API_NAME}] Client initialized successfully for model {self.MODEL_NAME}.")
             # DO NOT send initialization message to UI progress log
@@ -68,15 +71,16 @@ class OpenAIGPT4oTranscriptionAPI:
         final_language_used = None # Track the language assumption/result
 
         try:
-            # Check file existence before getting size
-            if not os.path.exists(audio_file_path):
-                 # SIMPLE UI ERROR MESSAGE
-                 msg = f"ERROR: Audio file not found at path: {audio_file_path}"
-                 if progress_callback: progress_callback(msg, True)
-                 logging.error(f"{log_prefix} {msg}") # Console log
-                 return None, None
-
-            file_size = os.path.getsize(audio_file_path)
+            # A single stat() checks existence and gets the size
+            try:
+                file_size = os.stat(audio_file_path).st_size
+            except FileNotFoundError:
+                # SIMPLE UI ERROR MESSAGE
+                msg = f"ERROR: Audio file not found at path: {audio_file_path}"
+                if progress_callback: progress_callback(msg, True)
+                logging.error(f"{log_prefix} {msg}") # Console log
+                return None, None
+
             file_length = file_service.get_audio_file_length(audio_file_path)
             # Check if splitting is needed (progress message handled by service layer)
             if file_size > file_service.OPENAI_MAX_FILE_SIZE or file_length > file_service.OPENAI_MAX_LENGTH_MS_4O:
@@ -89,9 +93,8 @@ class OpenAIGPT4oTranscriptionAPI:
             else:
                 # Transcribe single file
                 logging.info(f"{log_prefix} File size ({file_size / 1024 / 1024:.2f}MB) within limit, record within limit. Processing as single file.") # Console log
-                abs_path = os.path.abspath(audio_file_path)
-                temp_dir = os.path.dirname(abs_path)
-                if not file_service.validate_file_path(abs_path, temp_dir):
+                abs_path = audio_file_path  # Already built under Config.TEMP_UPLOADS_DIR (absolute)
+                if not file_service.validate_file_path(abs_path, Config.TEMP_UPLOADS_DIR):
                      # SIMPLE UI ERROR MESSAGE
                      msg = f"ERROR: Audio file path is not allowed or outside expected directory: {abs_path}"
                      if progress_callback: progress_callback(msg, True)
@@ -194,7 +197,7 @@ class OpenAIGPT4oTranscriptionAPI:
         requested_language = language_code
         log_prefix = f"[{self.API_NAME}:{display_filename or os.path.basename(audio_file_path)}]" # Prefix for internal console logs
 
-        temp_dir = os.path.dirname(audio_file_path)
+        temp_dir = Config.CHUNK_TEMP_DIR # Chunks may live on a tmpfs, away from the upload
         chunk_files = []
         final_language_used = None # Track language assumption
 
@@ -204,6 +207,9 @@ class OpenAIGPT4oTranscriptionAPI:
             if not chunk_files or len(chunk_files) == 0:
                 # Error logged by split_audio_file via callback
                 raise Exception("Audio splitting failed or resulted in no chunks.")
+            # Validate the chunk paths once here; the per-chunk transcription helper trusts them
+            if not all(file_service.validate_file_path(path, temp_dir) for path in chunk_files):
+                raise Exception("Audio splitting produced chunk files outside the chunk directory.")
 
             total_chunks = len(chunk_files)
             logging.info(f"{log_prefix} Starting transcription of {total_chunks} chunks...") # Console log only
@@ -256,6 +262,10 @@ class OpenAIGPT4oTranscriptionAPI:
                     # Console log only
                     logging.info(f"{log_prefix}:Chunk{chunk_num} Transcription successful.")
 
+                if error is not None:
+                    # Fail fast: drop chunks that have not started instead of uploading them for nothing
+                    executor.shutdown(wait=True, cancel_futures=True)
+
             # If any error occurred, abort
             if error is not None or any(r is None for r in results):
                 raise Exception(str(error) if error else "One or more chunks failed to transcribe.")
@@ -296,13 +306,12 @@ class OpenAIGPT4oTranscriptionAPI:
         finally:
             # Ensure cleanup of chunks
             if chunk_files:
-                # Send SIMPLE UI message for cleanup start
-                if progress_callback: progress_callback("Cleaning up temporary chunk files...", False)
-                removed_count = file_service.remove_files(chunk_files) # remove_files logs specifics to console
+                # Deleted by the background unlink thread; the result does not wait for it
+                queued_count = file_service.remove_files_in_background(chunk_files) # remove_files logs specifics to console
                 # Console log only
-                logging.info(f"{log_prefix} Cleaned up {removed_count} temporary chunk file(s).")
-                # Send SIMPLE UI message for cleanup finish
-                if progress_callback: progress_callback(f"Cleaned up {removed_count} temporary chunk file(s).", False)
+                logging.info(f"{log_prefix} Queued {queued_count} temporary chunk file(s) for cleanup.")
+                # Send SIMPLE UI message for cleanup
+                if progress_callback: progress_callback(f"Cleaning up {queued_count} temporary chunk file(s) in the background.", False)
 
 
     def _transcribe_single_chunk_with_retry(self, chunk_path: str, idx: int, total_chunks: int,
@@ -326,14 +335,8 @@ class OpenAIGPT4oTranscriptionAPI:
 #                progress_callback(f"Transcribing chunk {idx}/{total_chunks}", False)
 
             try:
-                abs_chunk_path = os.path.abspath(chunk_path)
-                temp_dir = os.path.dirname(abs_chunk_path)
-                if not file_service.validate_file_path(abs_chunk_path, temp_dir):
-                    msg = f"Chunk file path is not allowed: {abs_chunk_path}"
-                    logging.error(f"{effective_log_prefix} {msg}") # Console log
-                    raise ValueError(msg)
-
-                with open(abs_chunk_path, "rb") as audio_file:
+                abs_chunk_path = chunk_path  # Absolute, validated by the caller (upload or chunk dir)
+                with open(abs_chunk_path, "rb", buffering=file_service.UPLOAD_COPY_BUFFER_SIZE) as audio_file:
                     api_params = {
                         "model": self.MODEL_NAME,
                         "file": audio_file,
@@ -359,7 +362,7 @@ class OpenAIGPT4oTranscriptionAPI:
                     lang_note = ""
                     if requested_language == 'auto':
                         lang_note = " (Lang: 'auto' requested - implicit detection)"
-                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODES:
+                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODE_SET:
                         api_params["language"] = requested_language
                         ui_lang_msg = f"Language set to '{requested_language}'."
  #                       if progress_callback: progress_callback(ui_lang_msg, False)
@@ -413,7 +416,8 @@ class OpenAIGPT4oTranscriptionAPI:
             # --- Exception Handling for Retries ---
             except RateLimitError as rle:
                 last_error = rle
-                wait_time = 2 ** attempt # Exponential backoff
+                # Exponential backoff with jitter so parallel chunks don't retry in lockstep
+                wait_time = round(2 ** attempt + random.uniform(0, 1), 1)
                 # SIMPLE UI Message for retry
                 error_detail = f"Rate limit hit on chunk {idx}, attempt {attempt+1}. Retrying in {wait_time}s..."
                 if progress_callback: progress_callback(error_detail, False) # Not fatal yet
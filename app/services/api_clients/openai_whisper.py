@@ -3,10 +3,12 @@
 import os
 import logging
 import time
+import random
 from typing import Tuple, Optional, Callable
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from openai import OpenAI, OpenAIError, APIError, APIConnectionError, RateLimitError
+from openai import OpenAIError, APIError, APIConnectionError, RateLimitError
 from app.services import file_service
+from app.services.api_clients.openai_client import get_openai_client
 from app.config import Config
 
 # Define a type hint for the progress callback
@@ -29,7 +31,8 @@ class OpenAITranscriptionAPI:
             raise ValueError("OpenAI API key is required.")
         self.api_key = api_key
         try:
-            self.client = OpenAI(api_key=self.api_key)
+            # Reuse the process-wide client (and its connection pool)
+            self.client = get_openai_client(self.api_key)
             # Log successful initialization (console only)
             logging.info(f"[{self.API_NAME}] Client initialized successfully for model {self.MODEL_NAME}.")
             # DO NOT send initialization message to UI progress log
@@ -41,13 +44,12 @@ class OpenAITranscriptionAPI:
         lang_code = None
         lang_name_or_code = lang_name_or_code.strip().lower()
         # already have a supported language code, return it
-        if lang_name_or_code in (code.lower() for code in Config.SUPPORTED_LANGUAGE_CODES):
+        if lang_name_or_code in Config.SUPPORTED_LANGUAGE_CODE_SET:
             lang_code = lang_name_or_code
         # probably the language name
         if not lang_code:
-        # Reverse map names -> codes (ignore the 'auto' label if you want)
-            name_to_code = {name.lower(): code for code, name in Config.SUPPORTED_LANGUAGE_NAMES.items()}
-            lang_code = name_to_code.get(lang_name_or_code)
+        # Reverse map names -> codes (built once in Config)
+            lang_code = Config.LANGUAGE_NAME_TO_CODE.get(lang_name_or_code)
         # language not detected -> auto
         if not lang_code:
             lang_code = "auto"
@@ -78,16 +80,17 @@ class OpenAITranscriptionAPI:
         final_language_used: Optional[str] = None
 
         try:
-            # Check file existence before getting size
-            if not os.path.exists(audio_file_path):
-                 # SIMPLE UI ERROR MESSAGE
-                 msg = f"ERROR: Audio file not found at path: {audio_file_path}"
-                 if progress_callback:
+            # A single stat() checks existence and gets the size
+            try:
+                file_size = os.stat(audio_file_path).st_size
+            except FileNotFoundError:
+                # SIMPLE UI ERROR MESSAGE
+                msg = f"ERROR: Audio file not found at path: {audio_file_path}"
+                if progress_callback:
                     progress_callback(msg, True)
-                 logging.error(f"{log_prefix} {msg}")
-                 return None, None
+                logging.error(f"{log_prefix} {msg}")
+                return None, None
 
-            file_size = os.path.getsize(audio_file_path)
             file_length = file_service.get_audio_file_length(audio_file_path)
 
             # Decide whether to split; length threshold reused from file_service
@@ -102,16 +105,15 @@ class OpenAITranscriptionAPI:
             else:
                 # Transcribe single file
                 logging.info(f"{log_prefix} File size ({file_size / 1024 / 1024:.2f}MB) within limi. Processing as single file.")
-                abs_path = os.path.abspath(audio_file_path)
-                temp_dir = os.path.dirname(abs_path)
-                if not file_service.validate_file_path(abs_path, temp_dir):
+                abs_path = audio_file_path  # Already built under Config.TEMP_UPLOADS_DIR (absolute)
+                if not file_service.validate_file_path(abs_path, Config.TEMP_UPLOADS_DIR):
                      msg = f"ERROR: Audio file path is not allowed or outside expected directory: {abs_path}"
                      if progress_callback:
                         progress_callback(msg, True)
                      logging.error(f"{log_prefix} {msg}")
                      raise ValueError(msg)
 
-                with open(abs_path, "rb") as audio_file:
+                with open(abs_path, "rb", buffering=file_service.UPLOAD_COPY_BUFFER_SIZE) as audio_file:
                     api_params = {
                         "model": self.MODEL_NAME,
                         "file": audio_file,
@@ -128,7 +130,7 @@ class OpenAITranscriptionAPI:
                         lang_note = " (Language: 'auto' requested - implicit detection by model)"
                         if progress_callback:
                             progress_callback("Language: 'auto' requested - implicit detection by model.", False)
-                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODES:
+                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODE_SET:
                         api_params["language"] = requested_language
                     else:
                         logging.warning(f"{log_prefix} Invalid language code '{requested_language}'. Using auto-detection as fallback.")
@@ -238,7 +240,7 @@ class OpenAITranscriptionAPI:
         requested_language = language_code
         log_prefix = f"[{self.API_NAME}:{display_filename or os.path.basename(audio_file_path)}]" # Prefix for internal console logs
 
-        temp_dir = os.path.dirname(audio_file_path)
+        temp_dir = Config.CHUNK_TEMP_DIR # Chunks may live on a tmpfs, away from the upload
         chunk_files: list[str] = []
         first_chunk_language = None # Store language from first chunk if 'auto'
         final_language_used: Optional[str] = None
@@ -247,6 +249,9 @@ class OpenAITranscriptionAPI:
             chunk_files = file_service.split_audio_file(audio_file_path, temp_dir, progress_callback)
             if not chunk_files:
                 raise Exception("Audio splitting failed or resulted in no chunks.")
+            # Validate the chunk paths once here; the per-chunk transcription helper trusts them
+            if not all(file_service.validate_file_path(path, temp_dir) for path in chunk_files):
+                raise Exception("Audio splitting produced chunk files outside the chunk directory.")
 
             total_chunks = len(chunk_files)
             logging.info(f"{log_prefix} Starting transcription of {total_chunks} chunks...")
@@ -294,6 +299,10 @@ class OpenAITranscriptionAPI:
                         progress_callback(f"Transcribing {min(max_workers, total_chunks)} chunks in parallel. Already transcribed: {chunk_compl}/{total_chunks}.", False,)
                     logging.info(f"{log_prefix}:Chunk{chunk_num} Transcription successful.")
 
+                if error is not None:
+                    # Fail fast: drop chunks that have not started instead of uploading them for nothing
+                    executor.shutdown(wait=True, cancel_futures=True)
+
             if error is not None or any(r is None for r in results):
                 raise Exception(str(error) if error else "One or more chunks failed to transcribe.")
 
@@ -328,40 +337,30 @@ class OpenAITranscriptionAPI:
             return None, None
         finally:
             if chunk_files:
+                # Deleted by the background unlink thread; the result does not wait for it
+                queued_count = file_service.remove_files_in_background(chunk_files)
+                logging.info(f"{log_prefix} Queued {queued_count} temporary chunk file(s) for cleanup.")
                 if progress_callback:
-                    progress_callback("Cleaning up temporary chunk files...", False)
-                removed_count = file_service.remove_files(chunk_files)
-                logging.info(f"{log_prefix} Cleaned up {removed_count} temporary chunk file(s).")
-                if progress_callback:
-                    progress_callback(f"Cleaned up {removed_count} temporary chunk file(s).", False)
+                    progress_callback(f"Cleaning up {queued_count} temporary chunk file(s) in the background.", False)
 
 
     def _transcribe_single_chunk_with_retry(
             self, chunk_path: str, idx: int, total_chunks: int,
-            language_code: str, response_format: str,
+            language_code: str,
             progress_callback: ProgressCallback = None,
             context_prompt: str = "", log_prefix: str = "", max_retries: int = 3,
-        ) -> Tuple[Optional[str], Optional[str]]:
-        """Transcribes a single chunk with retry logic using Whisper."""
+        ) -> Optional[str]:
+        """Transcribes a single chunk with retry logic using Whisper. Returns None on failure."""
         requested_language = language_code
         chunk_base_name = os.path.basename(chunk_path)
         effective_log_prefix = log_prefix or f"[{self.API_NAME}:Chunk{idx}]"
 
-        abs_path = os.path.abspath(chunk_path)
-        temp_dir = os.path.dirname(abs_path)
-        if not file_service.validate_file_path(abs_path, temp_dir):
-            error_detail = (
-                f"ERROR: Chunk file path is not allowed or outside expected directory: {abs_path}"
-            )
-            if progress_callback:
-                progress_callback(error_detail, True)
-            logging.error(f"{effective_log_prefix} {error_detail}")
-            return None
+        abs_path = chunk_path  # Absolute, validated by the caller (upload or chunk dir)
 
         last_error: Optional[Exception] = None
         for attempt in range(max_retries):
             try:
-                with open(abs_path, "rb") as audio_file:
+                with open(abs_path, "rb", buffering=file_service.UPLOAD_COPY_BUFFER_SIZE) as audio_file:
                     api_params = {
                         "model": self.MODEL_NAME,
                         "file": audio_file,
@@ -375,7 +374,7 @@ class OpenAITranscriptionAPI:
                     lang_note = ""
                     if requested_language == "auto":
                         lang_note = " (Language: 'auto' requested - implicit detection by model)"
-                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODES:
+                    elif requested_language in Config.SUPPORTED_LANGUAGE_CODE_SET:
                         api_params["language"] = requested_language
                     else:
                         logging.warning(f"{effective_log_prefix} Invalid language code '{requested_language}'. Using auto-detection as fallback.")
@@ -391,24 +390,17 @@ class OpenAITranscriptionAPI:
                     # Console log only
                     logging.info(f"{effective_log_prefix} Attempt {attempt+1}: API call successful. Duration: {duration:.2f}s")
 
-                    # Process response
-                    text = None                    
-                    detected_lang = None # Language detected by API in this chunk
-                    if response_format == "verbose_json":
-                        text = response.text
-#                        detected_lang = response.language
-#                        # Console log only
-#                        logging.info(f"{effective_log_prefix} Detected language in chunk: {detected_lang}")
-                    else:
-                        text = response if isinstance(response, str) else str(response)
-                # Success - return text and detected language (if available)
+                    # Process response ("text" format returns a plain string)
+                    text = response if isinstance(response, str) else str(response)
+                # Success
                 # DO NOT send individual chunk success message to UI to reduce noise
-                return (text.strip() if text else ""), detected_lang
+                return text.strip() if text else "" # Return empty string for empty transcript
 
             # --- Exception Handling for Retries (Similar to GPT4o) ---
             except RateLimitError as rle:
                 last_error = rle
-                wait_time = 2**attempt
+                # Exponential backoff with jitter so parallel chunks don't retry in lockstep
+                wait_time = round(2**attempt + random.uniform(0, 1), 1)
                 # Non-fatal error, retry after delay
                 if progress_callback: progress_callback(f"Rate limit hit on chunk {idx}, attempt {attempt+1}. Retrying in {wait_time}s...",False,)
                 logging.warning(f"{effective_log_prefix} Rate limit hit, attempt {attempt+1}. Retrying in {wait_time}s... ({rle})")
@@ -2,16 +2,26 @@
 
 import os
 import time
+import shutil
+import contextlib
 import logging
-import json, subprocess, shlex, re
+import queue
+import atexit
+import threading
+import json, subprocess, re
+import wave
 from pathlib import Path
+from functools import lru_cache
 from typing import List, Callable, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pydub import AudioSegment, exceptions as pydub_exceptions
 
 # Allowed audio extensions
 ALLOWED_AUDIO_EXTENSIONS = {'mp3', 'm4a', 'wav', 'ogg', 'webm'}
 # Allowed video extensions (audio will be extracted via ffmpeg)
 ALLOWED_VIDEO_EXTENSIONS = {'mp4', 'mov', 'avi', 'mkv', 'flv', 'wmv', 'webm'}
+# Dotted suffixes of all accepted uploads, for a single str.endswith() check
+_ALLOWED_SUFFIXES = tuple('.' + ext for ext in ALLOWED_AUDIO_EXTENSIONS | ALLOWED_VIDEO_EXTENSIONS)
 # Extensions that can be directly copied without re-encoding
 #  (handled by ffmpeg segment muxer)
 DIRECT_COPY_EXTENSIONS = "mp3, m4a, wav"
@@ -43,6 +53,26 @@ OPENAI_MAX_LENGTH_MS_4O = CHUNK_LENGTH_MS
 # Files to ignore during cleanup
 IGNORE_FILES = {'.DS_Store', '.gitkeep'}
 
+# Sanity bounds for audio stream headers; uploads outside them are rejected before processing
+AUDIO_MIN_SAMPLE_RATE = 8000 # Hz
+AUDIO_MAX_SAMPLE_RATE = 384000 # Hz
+AUDIO_MAX_CHANNELS = 8
+# Max seconds ffprobe may spend on an upload's header (runs inside the upload request)
+HEADER_PROBE_TIMEOUT = 3
+
+# ffmpeg/ffprobe executables, resolved on PATH once at import instead of on every spawn.
+# Spawns keep subprocess's default close_fds=True: the children must not inherit the
+# worker's sockets and SQLite handles; closing them in the child is cheap next to an ffmpeg run.
+FFMPEG_BIN = shutil.which("ffmpeg") or "ffmpeg"
+FFPROBE_BIN = shutil.which("ffprobe") or "ffprobe"
+
+# Max ffmpeg range exports running at once per process, shared by all jobs (fixed-length split)
+SPLIT_MAX_PARALLEL_EXPORTS = 2
+_range_export_slots = threading.BoundedSemaphore(SPLIT_MAX_PARALLEL_EXPORTS)
+
+# Buffer size for streaming uploads to disk and audio files to the APIs (1 MiB)
+UPLOAD_COPY_BUFFER_SIZE = 1 << 20
+
 def is_audio_file(filename: str) -> bool:
     """Returns True if the file looks like supported audio."""
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_AUDIO_EXTENSIONS
@@ -55,10 +85,128 @@ def is_video_file(filename: str) -> bool:
 
 def allowed_file(filename: str) -> bool:
     """Checks if the file extension is allowed (audio or video)."""
-    if '.' not in filename:
-        return False
-    ext = filename.rsplit('.', 1)[1].lower()
-    return (ext in ALLOWED_AUDIO_EXTENSIONS) or (ext in ALLOWED_VIDEO_EXTENSIONS)
+    return filename.lower().endswith(_ALLOWED_SUFFIXES)
+
+def _sendfile_upload(src_fd: int, offset: int, out_fd: int) -> None:
+    """Copies src_fd from offset to the end into out_fd inside the kernel (os.sendfile)."""
+    remaining = os.fstat(src_fd).st_size - offset
+    while remaining > 0:
+        sent = os.sendfile(out_fd, src_fd, offset, remaining) # May copy less than asked; loop
+        if sent == 0:
+            break
+        offset += sent
+        remaining -= sent
+
+
+def save_upload(stream, dest_path: str, hasher=None) -> None:
+    """Streams an uploaded file to disk in 1 MiB blocks (fewer, larger write() calls).
+
+    Werkzeug spools larger uploads to a temporary file; when the stream is already on disk
+    it is copied with os.sendfile where available, so the data does not pass through Python.
+    Small uploads stay in memory and are copied in Python (asking them for a file descriptor
+    would force a SpooledTemporaryFile to roll over to disk first).
+    With a hashlib hasher (DEDUPLICATE_UPLOADS) the bytes are hashed as they are copied
+    (one pass, no sendfile).
+    """
+    if hasher is not None:
+        with open(dest_path, "wb", buffering=UPLOAD_COPY_BUFFER_SIZE) as out:
+            while True:
+                block = stream.read(UPLOAD_COPY_BUFFER_SIZE)
+                if not block:
+                    return
+                hasher.update(block)
+                out.write(block)
+
+    src_fd = None
+    # An unrolled SpooledTemporaryFile is still in memory (_rolled is its own flag);
+    # BytesIO has no descriptor at all
+    if hasattr(os, "sendfile") and getattr(stream, "_rolled", True):
+        try:
+            src_fd = stream.fileno()
+        except (AttributeError, OSError, ValueError):
+            src_fd = None # In-memory upload (BytesIO)
+
+    if src_fd is not None:
+        offset = stream.tell()
+        with open(dest_path, "wb", buffering=0) as out:
+            try:
+                _sendfile_upload(src_fd, offset, out.fileno())
+                return
+            except OSError as e:
+                # e.g. a filesystem without sendfile support: start over with a plain copy
+                logging.debug(f"[SYSTEM] sendfile failed for upload ({e}); using buffered copy.")
+                out.truncate(0)
+        stream.seek(offset)
+
+    with open(dest_path, "wb", buffering=UPLOAD_COPY_BUFFER_SIZE) as out:
+        shutil.copyfileobj(stream, out, UPLOAD_COPY_BUFFER_SIZE)
+
+
+def _probe_int(value) -> Optional[int]:
+    """Parses a numeric ffprobe field; missing, unparseable or 0 (ffprobe's "unknown") gives None."""
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        return None
+    return number if number > 0 else None
+
+def _check_stream_params(sample_rate: Optional[int], channels: Optional[int]) -> Optional[str]:
+    """Returns a rejection reason if sample rate/channel count are out of bounds, else None.
+    Unknown values (None) are not checked; ffmpeg deals with them when the job runs."""
+    if sample_rate is not None and not AUDIO_MIN_SAMPLE_RATE <= sample_rate <= AUDIO_MAX_SAMPLE_RATE:
+        return f"Unsupported audio sample rate: {sample_rate} Hz."
+    if channels is not None and not 1 <= channels <= AUDIO_MAX_CHANNELS:
+        return f"Unsupported number of audio channels: {channels}."
+    return None
+
+def validate_audio_header(file_path: str) -> Optional[str]:
+    """
+    Sanity-checks the audio header of an upload before it is queued, so a crafted header
+    (e.g. a 100 MHz sample rate or 65535 channels) cannot tie up ffmpeg and a worker.
+    PCM WAV is read with the stdlib wave module; everything else (and WAV variants wave
+    cannot parse) is probed with ffprobe.
+    Returns a rejection reason, or None if the file looks sane (or cannot be probed here).
+    """
+    base_name = os.path.basename(file_path)
+    if file_extension(file_path).lower() == "wav":
+        try:
+            with wave.open(file_path, "rb") as wav:
+                return _check_stream_params(wav.getframerate(), wav.getnchannels())
+        except (wave.Error, EOFError):
+            pass # Not plain PCM (e.g. float/extensible) or truncated: let ffprobe decide
+
+    cmd = [
+        FFPROBE_BIN,
+        "-v", "error",
+        "-select_streams", "a",
+        "-show_entries", "stream=sample_rate,channels",
+        "-of", "json",
+        file_path,
+    ]
+    try:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+                                timeout=HEADER_PROBE_TIMEOUT)
+    except FileNotFoundError:
+        logging.warning("[SYSTEM] ffprobe not found; skipping audio header validation.")
+        return None
+    except subprocess.TimeoutExpired:
+        # Slow to probe is not proof of a bad header (e.g. a busy host): let the job decide
+        logging.warning(f"[SYSTEM] ffprobe timed out reading header of '{base_name}'; skipping audio header validation.")
+        return None
+    if result.returncode != 0:
+        logging.warning(f"[SYSTEM] ffprobe rejected '{base_name}': {result.stderr.strip()}")
+        return "The file is not a readable audio/video file."
+    try:
+        streams = json.loads(result.stdout or "{}").get("streams", [])
+    except json.JSONDecodeError:
+        return "The file is not a readable audio/video file."
+    if not streams:
+        return "The file contains no audio stream."
+    for stream in streams:
+        reason = _check_stream_params(_probe_int(stream.get("sample_rate")), _probe_int(stream.get("channels")))
+        if reason:
+            return reason
+    return None
 
 def file_extension(filename: str) -> str:
     """Returns the file extension of a filename."""
@@ -85,16 +233,13 @@ def extract_audio_from_video(input_path: str,
         output_path = os.path.join(output_dir, f"{base}.{audio_ext}")
 
         # If an old file exists with the same name, remove it to avoid mixups
-        if os.path.exists(output_path):
-            try:
-                os.remove(output_path)
-            except Exception:
-                pass
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(output_path)
 
         # Common, broadly compatible audio extraction settings
         # -vn drop video; set stereo 2ch, 44.1kHz for good compatibility
         cmd = [
-            "ffmpeg", "-hide_banner", "-loglevel", "error",
+            FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
             "-y",
             "-i", input_path,
             "-vn",
@@ -119,7 +264,7 @@ def extract_audio_from_video(input_path: str,
             progress_callback("Extracting audio from video...", False)
         logging.info(f"[SYSTEM] Extracting audio via ffmpeg: '{os.path.basename(input_path)}' -> '{os.path.basename(output_path)}'")
 
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         if result.returncode != 0:
             err = (result.stderr or "ffmpeg failed").strip()
             msg = f"ERROR: Audio extraction failed: {err}"
@@ -163,8 +308,25 @@ def ordinal(n: int) -> str:
     return f"{n}{suffix}"
 
 
+_PROGRESS_OUT_TIME_RE = re.compile(r"^out_time_(?:us|ms)=(\d+)$", re.MULTILINE)
+
+
 def get_audio_file_length(file_path: str) -> int:
-    """Returns the length of the audio file in milliseconds."""
+    """
+    Returns the length of the audio file in milliseconds.
+    A job asks for the length of the same file several times (size check, cut point planning);
+    results are cached per path, modification time and size, so the probe runs once per file.
+    """
+    try:
+        file_stat = os.stat(file_path)
+    except OSError:
+        return 0
+    return _get_audio_file_length_cached(file_path, file_stat.st_mtime_ns, file_stat.st_size)
+
+
+@lru_cache(maxsize=32)
+def _get_audio_file_length_cached(file_path: str, mtime_ns: int, size: int) -> int:
+    """Probes the length once per file version (mtime_ns and size are part of the cache key)."""
     audio_len = get_audio_file_length_fast(file_path)
     if audio_len == 0:
         audio_len = get_audio_file_length_slow(file_path)
@@ -175,9 +337,9 @@ def get_audio_file_length_fast(audio_file_path: str) -> int:
     audio_len = 0
     if Path(audio_file_path).is_file():
         # Use ffprobe to get duration in seconds, convert to milliseconds
-        cmd = f'ffprobe -v error -print_format json -show_format "{audio_file_path}"'
+        cmd = [FFPROBE_BIN, "-v", "error", "-print_format", "json", "-show_format", audio_file_path]
         try:
-            data = subprocess.check_output(shlex.split(cmd))
+            data = subprocess.check_output(cmd)
             info = json.loads(data)
             audio_len = round(float(info["format"]["duration"]) * 1000)
         except subprocess.CalledProcessError as e:
@@ -191,42 +353,51 @@ def get_audio_file_length_fast(audio_file_path: str) -> int:
 
 
 def get_audio_file_length_slow(file_path: str) -> int:
+    """
+    Returns the length in milliseconds for files whose container has no duration header
+    (e.g. streamed webm), by letting ffmpeg read all packets with stream copy:
+      ffmpeg -progress pipe:1 -i input.webm -vn -c:a copy -f null -
+    Nothing is decoded, unlike loading the whole file with pydub. Returns 0 on failure.
+    """
     base_name_orig = os.path.basename(file_path)
-
+    cmd = [
+        FFMPEG_BIN, "-hide_banner", "-nostdin", "-loglevel", "error",
+        "-progress", "pipe:1",
+        "-i", file_path,
+        "-vn", "-c:a", "copy",
+        "-f", "null", "-",
+    ]
     try:
-        # Add explicit logging for pydub loading attempt (console only)
-        logging.info(f"[SYSTEM] Loading audio file '{base_name_orig}' for checking...")
-        audio = AudioSegment.from_file(file_path)
-        logging.info(f"[SYSTEM] Successfully loaded '{base_name_orig}'. Duration: {len(audio) / 1000:.2f}s")
-    except pydub_exceptions.CouldntDecodeError as cde:
-        # SIMPLE UI ERROR MESSAGE
-        msg = f"ERROR: Could not decode audio file '{base_name_orig}'. Ensure ffmpeg is installed and file is valid."
+        # Console log only
+        logging.info(f"[SYSTEM] Reading audio file '{base_name_orig}' to determine its duration...")
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+    except Exception as e:
+        logging.error(f"[SYSTEM] Failed running ffmpeg on '{base_name_orig}': {e}")
         return 0
-    except FileNotFoundError:
-        # SIMPLE UI ERROR MESSAGE
-        msg = f"ERROR: Audio file not found at '{file_path}'"
+    # out_time_us (out_time_ms in older builds, also microseconds) of the last progress block
+    times = _PROGRESS_OUT_TIME_RE.findall(result.stdout or "")
+    if result.returncode != 0 or not times:
+        logging.error(f"[SYSTEM] Could not determine duration of '{base_name_orig}': {(result.stderr or '').strip()}")
         return 0
-    except Exception as e: # Catch other potential pydub errors
-        # SIMPLE UI ERROR MESSAGE
-        msg = f"ERROR: Failed loading audio file '{base_name_orig}': {e}"
-        return 0
-
-    total_length = len(audio)
+    total_length = int(times[-1]) // 1000
+    logging.info(f"[SYSTEM] Duration of '{base_name_orig}': {total_length / 1000:.2f}s")
     return total_length
 
 
-
 def split_audio_file(file_path: str, temp_dir: str,
                      progress_callback: Optional[Callable[[str, bool], None]] = None,
                      chunk_length_ms: int = CHUNK_LENGTH_MS,
                      chunk_direct_format: str = "mp3,m4a,webm") -> List[str]:
-    """Splits an audio file into chunks, reporting progress via callback."""
+    """Splits an audio file into chunks in temp_dir, reporting progress via callback."""
+    os.makedirs(temp_dir, exist_ok=True)
     # Extract file extension from file_path
     chunks = []
     ext = file_extension(file_path).lower()
-    # Direct conversion using ffmpeg segment muxer if format matches
-    if ext in ALLOWED_AUDIO_EXTENSIONS and ext in chunk_direct_format:
-        # s
+    # Split with the ffmpeg segment muxer in one pass: stream copy if the format can be
+    # cut as-is, otherwise re-encode to mp3 on the fly (no PCM round-trip through Python)
+    if ext in ALLOWED_AUDIO_EXTENSIONS:
+        stream_copy = ext in chunk_direct_format
+        chunk_ext = ext if stream_copy else "mp3"
         total_len_ms = get_audio_file_length(file_path)
         cut_points = []
 
@@ -237,14 +408,14 @@ def split_audio_file(file_path: str, temp_dir: str,
 
 #        if total_len_ms > chunk_length_ms + CHUNK_MIN_LENGTH_MS:
         if CHUNK_SPLIT_USE_DEEP_SEARCH:
-            cut_points = compute_smart_segment_times_deep(file_path, chunk_length_ms=CHUNK_LENGTH_MS,
+            cut_points = compute_smart_segment_times_deep(file_path, chunk_length_ms=chunk_length_ms,
                 back_window_sec=CHUNK_SPLIT_BACK_WINDOW_SEC,
                 forward_window_sec=CHUNK_SPLIT_FORWARD_WINDOW_SEC,
                 noise_db=CHUNK_SPLIT_NOISE_DB,
                 min_silence_dur=CHUNK_SPLIT_MIN_SILENCE_DUR
             )
         else:    
-            cut_points = compute_smart_segment_times(file_path, chunk_length_ms=CHUNK_LENGTH_MS,
+            cut_points = compute_smart_segment_times(file_path, chunk_length_ms=chunk_length_ms,
                 back_window_sec=CHUNK_SPLIT_BACK_WINDOW_SEC,
                 forward_window_sec=CHUNK_SPLIT_FORWARD_WINDOW_SEC,
                 noise_db=CHUNK_SPLIT_NOISE_DB,
@@ -259,7 +430,7 @@ def split_audio_file(file_path: str, temp_dir: str,
 
             base_name_orig = os.path.basename(file_path)
             base_name_no_ext = os.path.splitext(base_name_orig)[0]
-            chunk_filename_pattern = base_name_no_ext + "_chunk_%02d" + "." + ext
+            chunk_filename_pattern = base_name_no_ext + "_chunk_%02d" + "." + chunk_ext
     
             if progress_callback:
                 # SIMPLE UI MESSAGE
@@ -267,12 +438,14 @@ def split_audio_file(file_path: str, temp_dir: str,
             # Use absolute path for output directory        
 
             out_dir = os.path.abspath(temp_dir)
-            parts = split_audio_file_fast_ffmpeg(file_path, out_dir, cut_points, progress_callback, chunk_filename_pattern)        
+            codec_args = None if stream_copy else ["-vn", "-c:a", "libmp3lame"]
+            parts = split_audio_file_fast_ffmpeg(file_path, out_dir, cut_points, progress_callback,
+                                                 chunk_filename_pattern, codec_args)
             if parts:
                 chunks.extend(parts)
                 return chunks
             else:
-                msg = "Fast ffmpeg split failed; falling back to pydub method."
+                msg = "Fast ffmpeg split failed; falling back to per-chunk ffmpeg method."
                 logging.warning(f"[SYSTEM] {msg}")
 
         else :
@@ -281,13 +454,106 @@ def split_audio_file(file_path: str, temp_dir: str,
 #            return [file_path] # Return original file as single chunk
 
 
-    # Fallback to pydub and slow conversion method to mp3
+    # Fallback: fixed-length chunks cut and re-encoded to mp3 by ffmpeg, one range at a time
+    if not chunks:
+        chunks = split_audio_file_ffmpeg_ranges(file_path, temp_dir, progress_callback, chunk_length_ms, "mp3")
+
+    # Last resort: pydub (decodes the whole file into memory)
     if not chunks:
         chunks = split_audio_file_pydup(file_path, temp_dir, progress_callback, chunk_length_ms, "mp3")
 
     return chunks
 
 
+def _export_range_ffmpeg(file_path: str, start_ms: int, duration_ms: int,
+                         out_path: str, codec_args: List[str]) -> None:
+    """Writes one time range of file_path to out_path with ffmpeg; raises RuntimeError on failure."""
+    cmd = [
+        FFMPEG_BIN, "-hide_banner", "-loglevel", "error",
+        "-y",
+        "-ss", f"{start_ms / 1000:.3f}",
+        "-t", f"{duration_ms / 1000:.3f}",
+        "-i", file_path,
+        "-vn",
+        *codec_args,
+        out_path,
+    ]
+    # Concurrent jobs share the slots, so the process never runs more than
+    # SPLIT_MAX_PARALLEL_EXPORTS of these ffmpeg processes at once
+    with _range_export_slots:
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0 or not os.path.exists(out_path):
+        raise RuntimeError((result.stderr or "ffmpeg returned non-zero exit code.").strip())
+
+
+def split_audio_file_ffmpeg_ranges(file_path: str, temp_dir: str,
+                     progress_callback: Optional[Callable[[str, bool], None]] = None,
+                     chunk_length_ms: int = CHUNK_LENGTH_MS,
+                     chunk_format: str = "mp3") -> List[str]:
+    """
+    Splits an audio file into fixed-length chunks with one ffmpeg call per chunk,
+    running up to SPLIT_MAX_PARALLEL_EXPORTS calls in parallel (shared by all jobs).
+
+    Each call seeks on the input side (-ss before -i) and decodes only its own
+    range, so memory stays O(chunk) instead of O(file) as with pydub:
+      ffmpeg -ss 500 -t 500 -i input.wav -vn -c:a libmp3lame part_2.mp3
+    Sources already in chunk_format are stream-copied (-c:a copy) instead of re-encoded.
+
+    Returns the chunk paths in order, or an empty list on failure.
+    """
+    base_name_orig = os.path.basename(file_path)
+    base_name_no_ext = os.path.splitext(base_name_orig)[0]
+
+    total_length = get_audio_file_length(file_path)
+    if total_length <= 0:
+        logging.warning(f"[SYSTEM] Could not determine duration of '{base_name_orig}'; skipping ffmpeg range split.")
+        return []
+
+    if file_extension(file_path).lower() == chunk_format:
+        codec_args = ["-c:a", "copy"] # Same format: cut the bitstream, no decode/re-encode
+    else:
+        codec_args = ["-c:a", "libmp3lame"] if chunk_format == "mp3" else []
+    num_chunks = (total_length + chunk_length_ms - 1) // chunk_length_ms # Calculate total chunks
+    chunk_files = [
+        os.path.join(temp_dir, f"{base_name_no_ext}_chunk_{chunk_index}." + chunk_format)
+        for chunk_index in range(1, num_chunks + 1)
+    ]
+
+    if progress_callback:
+        # SIMPLE UI MESSAGE
+        progress_callback(f"Splitting into {num_chunks} chunks...", False)
+
+    # The ranges do not overlap, so their ffmpeg processes run side by side (bounded per process)
+    max_workers = max(1, min(num_chunks, SPLIT_MAX_PARALLEL_EXPORTS))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        future_to_index = {}
+        for chunk_index, start_ms in enumerate(range(0, total_length, chunk_length_ms), start=1):
+            duration_ms = min(chunk_length_ms, total_length - start_ms)
+            # Log export attempt (console only)
+            logging.info(f"[SYSTEM] Exporting chunk {chunk_index}/{num_chunks} to '{os.path.basename(chunk_files[chunk_index - 1])}' via ffmpeg...")
+            future = executor.submit(_export_range_ffmpeg, file_path, start_ms, duration_ms,
+                                     chunk_files[chunk_index - 1], codec_args)
+            future_to_index[future] = chunk_index
+
+        for future in as_completed(future_to_index):
+            chunk_index = future_to_index[future]
+            try:
+                future.result()
+            except Exception as e:
+                # Console only: the caller falls back to pydub
+                logging.error(f"[SYSTEM] ffmpeg range split failed on chunk {chunk_index} ('{os.path.basename(chunk_files[chunk_index - 1])}'): {e}")
+                # Drop ranges that have not started, then clean up everything written so far
+                executor.shutdown(wait=True, cancel_futures=True)
+                remove_files(chunk_files)
+                return []
+            # Report progress via callback - SIMPLE UI MESSAGE
+            if progress_callback:
+                progress_callback(f"Created {ordinal(chunk_index)} audio chunk of {num_chunks}", False)
+
+    logging.info(f"[SYSTEM] Finished splitting '{base_name_orig}' into {len(chunk_files)} chunks via ffmpeg.")
+    return chunk_files
+
+
 
 def split_audio_file_pydup(file_path: str, temp_dir: str,
                      progress_callback: Optional[Callable[[str, bool], None]] = None,
@@ -375,14 +641,13 @@ def remove_files(file_paths: List[str]) -> int:
     for path in file_paths:
         file_basename = os.path.basename(path)
         try:
-            if os.path.exists(path):
-                os.remove(path)
-                # Use INFO level for successful removal (console only)
-                logging.info(f"[SYSTEM] Removed temp file: {file_basename}")
-                removed_count += 1
-            else:
-                # Use DEBUG level if file was already gone (console only)
-                logging.debug(f"[SYSTEM] Temp file already removed: {file_basename}")
+            os.unlink(path)
+            # Use INFO level for successful removal (console only)
+            logging.info(f"[SYSTEM] Removed temp file: {file_basename}")
+            removed_count += 1
+        except FileNotFoundError:
+            # Use DEBUG level if file was already gone (console only)
+            logging.debug(f"[SYSTEM] Temp file already removed: {file_basename}")
         except OSError as e:
             # Log error during removal (console only)
             logging.error(f"[SYSTEM] Error removing file '{file_basename}': {e}")
@@ -391,11 +656,56 @@ def remove_files(file_paths: List[str]) -> int:
     return removed_count
 
 
+# Files queued for deletion by a background thread, so a job does not wait for the unlinks
+# (slow on some storage) before its result is saved
+_unlink_queue: "queue.Queue[str]" = queue.Queue()
+_unlink_thread: Optional[threading.Thread] = None
+_unlink_thread_lock = threading.Lock()
+
+def _unlink_worker() -> None:
+    """Deletes queued files, one at a time, for the lifetime of the process."""
+    while True:
+        path = _unlink_queue.get()
+        try:
+            remove_files([path])
+        finally:
+            _unlink_queue.task_done()
+
+def _drain_unlink_queue() -> None:
+    """Deletes whatever is still queued (at interpreter exit, before daemon threads stop)."""
+    while True:
+        try:
+            path = _unlink_queue.get_nowait()
+        except queue.Empty:
+            return
+        remove_files([path])
+        _unlink_queue.task_done()
+
+def remove_files_in_background(file_paths: List[str]) -> int:
+    """Queues files for deletion by the background unlink thread. Returns the number queued."""
+    global _unlink_thread
+    with _unlink_thread_lock:
+        if _unlink_thread is None:
+            # Started on first use, i.e. inside the (forked) worker process that needs it
+            _unlink_thread = threading.Thread(target=_unlink_worker, name="unlink", daemon=True)
+            _unlink_thread.start()
+            atexit.register(_drain_unlink_queue)
+    for path in file_paths:
+        _unlink_queue.put(path)
+    return len(file_paths)
+
+
+@lru_cache(maxsize=8)
+def _resolved_dir(directory: str) -> str:
+    """Resolves an allowed directory once (the configured upload/chunk dirs do not move)."""
+    return os.path.realpath(directory)
+
+
 def validate_file_path(file_path: str, allowed_dir: str) -> bool:
-    """Validates that a file path is within an allowed directory."""
+    """Validates that a file path is within an allowed directory (after resolving symlinks)."""
     try:
-        abs_allowed_dir = os.path.abspath(allowed_dir)
-        abs_file_path = os.path.abspath(file_path)
+        abs_allowed_dir = _resolved_dir(allowed_dir)
+        abs_file_path = os.path.realpath(file_path)
         # Ensure commonpath returns the allowed directory itself, preventing traversal
         is_valid = os.path.commonpath([abs_allowed_dir, abs_file_path]) == abs_allowed_dir
         if not is_valid:
@@ -413,53 +723,51 @@ def cleanup_old_files(directory: str, threshold_seconds: int) -> int:
     Logs actions and returns the count of deleted files.
     """
     deleted_count = 0
-    if not os.path.exists(directory):
-        logging.warning(f"[SYSTEM] Cleanup directory not found: {directory}")
-        return 0 # Nothing to delete
-
     current_time = time.time()
+    # Files last modified before this are old enough to delete
+    cutoff = current_time - threshold_seconds
     logging.info(f"[SYSTEM] Starting cleanup scan in directory: {directory}")
 
     try:
-        for filename in os.listdir(directory):
-            # Skip ignored files
-            if filename in IGNORE_FILES:
-                logging.debug(f"[SYSTEM] Skipping ignored file: {filename}")
-                continue
-
-            file_path = os.path.join(directory, filename)
-
-            try:
-                # Check if it's a file (and not a directory or symlink) before stating
-                if os.path.isfile(file_path):
-                    file_stat = os.stat(file_path)
-                    file_age = current_time - file_stat.st_mtime
-
-                    if file_age > threshold_seconds:
-                        # Console log
-                        logging.info(f"[SYSTEM] Deleting old file: {filename} (Age: {file_age:.0f}s)")
-                        # Check existence again right before removing (mitigate race condition)
-                        if os.path.exists(file_path):
-                            os.remove(file_path)
-                            logging.info(f"[SYSTEM] Successfully deleted old file: {filename}")
-                            deleted_count += 1
-                        else:
-                            logging.warning(f"[SYSTEM] Old file '{filename}' already removed (likely concurrent process).")
+        # scandir yields the entry type from the directory listing itself, so only regular
+        # files cost a stat() (for their age) and the unlink; no isfile/exists probes
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                filename = entry.name
+                # Skip ignored files
+                if filename in IGNORE_FILES:
+                    logging.debug("[SYSTEM] Skipping ignored file: %s", filename)
+                    continue
+
+                try:
+                    # Only regular files (not directories or symlinks)
+                    if not entry.is_file(follow_symlinks=False):
+                        continue
+                    mtime = entry.stat(follow_symlinks=False).st_mtime
+
+                    if mtime < cutoff:
+                        os.unlink(entry.path)
+                        # Console log; one lazily formatted line per file (sweeps may delete many)
+                        logging.info("[SYSTEM] Deleted old file: %s (Age: %.0fs)", filename, current_time - mtime)
+                        deleted_count += 1
                     # else: # Optional: Debug log for files checked but not old enough
-                    #    logging.debug(f"[SYSTEM] Keeping file: {filename} (Age: {file_age:.0f}s)")
-
-            except FileNotFoundError:
-                # Catch error if file is removed between listdir and stat/isfile/remove
-                logging.warning(f"[SYSTEM] File not found during cleanup scan (likely removed concurrently): {filename}")
-            except OSError as e:
-                # Catch other potential errors like permission issues during stat/remove
-                logging.error(f"[SYSTEM] OS error processing file '{filename}' during cleanup: {e}")
-            except Exception as e:
-                # Catch any other unexpected errors during file processing
-                logging.exception(f"[SYSTEM] Unexpected error processing file '{filename}' during cleanup: {e}")
+                    #    logging.debug("[SYSTEM] Keeping file: %s (Age: %.0fs)", filename, current_time - mtime)
+
+                except FileNotFoundError:
+                    # Removed between the listing and stat/unlink (e.g. by a finishing job)
+                    logging.warning(f"[SYSTEM] Old file '{filename}' already removed (likely concurrent process).")
+                except OSError as e:
+                    # Catch other potential errors like permission issues during stat/remove
+                    logging.error(f"[SYSTEM] OS error processing file '{filename}' during cleanup: {e}")
+                except Exception as e:
+                    # Catch any other unexpected errors during file processing
+                    logging.exception(f"[SYSTEM] Unexpected error processing file '{filename}' during cleanup: {e}")
 
+    except FileNotFoundError:
+        logging.warning(f"[SYSTEM] Cleanup directory not found: {directory}")
+        return 0 # Nothing to delete
     except Exception as e:
-        # Catch errors during listdir itself
+        # Catch errors during scandir itself
         logging.exception(f"[SYSTEM] Error listing directory '{directory}' during cleanup: {e}")
 
     logging.info(f"[SYSTEM] Cleanup scan finished for directory: {directory}. Deleted {deleted_count} file(s).")
@@ -472,9 +780,11 @@ def split_audio_file_fast_ffmpeg(
     segment_times_ms: List[int],
     progress_callback: Optional[Callable[[str, bool], None]] = None,
     output_pattern: Optional[str] = None,
+    codec_args: Optional[List[str]] = None,
 ) -> List[str]:
     """
-    Quickly splits an audio file into chunks using ffmpeg's segment muxer without re-encoding.
+    Quickly splits an audio file into chunks using ffmpeg's segment muxer, without re-encoding
+    by default.
 
     Calls ffmpeg with flags equivalent to:
       ffmpeg -i Audio_20250724.m4a -f segment -segment_times 600000,1200000,... \
@@ -486,6 +796,8 @@ def split_audio_file_fast_ffmpeg(
         segment_times_ms: List of split times in milliseconds (e.g., [600000, 1200000, ...]).
         progress_callback: Optional progress reporter (message, is_error).
         output_pattern: Optional basename pattern like "part_%02d.ext". Defaults to source extension.
+        codec_args: Optional ffmpeg codec arguments replacing "-c copy", e.g. ["-vn", "-c:a", "libmp3lame"]
+            for sources that cannot be stream-copied (the pattern extension must match the codec).
 
     Returns:
         List of created chunk file paths in index order. Empty list on failure.
@@ -519,13 +831,13 @@ def split_audio_file_fast_ffmpeg(
 
     # Build ffmpeg command
     cmd = [
-        "ffmpeg",
+        FFMPEG_BIN,
         "-hide_banner", "-loglevel", "error",
         "-y",
         "-i", abs_input,
         "-f", "segment",
         "-segment_times", seg_str,
-        "-c", "copy",
+        *(codec_args or ["-c", "copy"]),
         "-reset_timestamps", "1",
         "-fflags", "+bitexact",
         "-flags:v", "+bitexact",
@@ -540,7 +852,7 @@ def split_audio_file_fast_ffmpeg(
 
     try:
         start = time.time()
-        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
         duration = time.time() - start
         if result.returncode != 0:
             err = result.stderr.strip() or "ffmpeg returned non-zero exit code."
@@ -605,7 +917,7 @@ def detect_silences_ffmpeg(
     filter_arg = f"silencedetect=n={noise_db}dB:d={min_silence_dur}"
 
     cmd = [
-        "ffmpeg",
+        FFMPEG_BIN,
         "-hide_banner", "-nostats", "-loglevel", "info",
         *(['-ss', str(start_time)] if start_time and start_time >= 0.001 else []),
         *(['-to', str(finish_time)] if finish_time and finish_time > 0.001 and abs(finish_time - start_time) > min_silence_dur else []),
@@ -618,7 +930,7 @@ def detect_silences_ffmpeg(
 
     try:
         # Capture stderr where silencedetect writes its logs
-        proc = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True)
+        proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
     except FileNotFoundError:
         logging.error("[SYSTEM] ERROR: ffmpeg is not installed or not found in PATH.")
         return []
@@ -992,7 +1304,7 @@ def get_audio_sample_rate_ffprobe(audio_file_path: str) -> int:
         return 0
 
     cmd = [
-        "ffprobe",
+        FFPROBE_BIN,
         "-v", "error",
         "-select_streams", "a:0",
         "-show_entries", "stream=sample_rate",
@@ -1156,7 +1468,7 @@ def compute_low_volume_percentage_ffmpeg(
     filter_arg = ",".join(filters)
 
     cmd = [
-        "ffmpeg",
+        FFMPEG_BIN,
         "-hide_banner", "-nostats",
         "-i", abs_input,
         "-af", filter_arg,
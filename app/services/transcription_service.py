@@ -4,9 +4,13 @@ import os
 import uuid
 import threading
 import logging
+from contextlib import nullcontext
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, Future
 from datetime import datetime, timezone
-from typing import Callable, Optional, Any
-from flask import current_app
+from collections import deque
+from typing import Callable, Optional, Any, Deque, Dict
+from flask import current_app, has_app_context
 from app import app # Import the app instance
 
 # Use the new DB functions for status/progress
@@ -21,31 +25,217 @@ from app.services.api_clients.gemini import GeminiTranscriptionAPI
 # Import specific API errors if available (example for OpenAI)
 from openai import OpenAIError
 
+# --- Persistent Worker Pool ---
+
+def _init_transcription_worker() -> None:
+    """Pool initializer: pushes one app context that lives as long as the worker thread.
+
+    Jobs (and their progress updates) then reuse this context and its DB connection
+    instead of pushing a fresh context per job/message.
+    """
+    app.app_context().push()
+    logging.info(f"[SYSTEM] Transcription worker '{threading.current_thread().name}' started.")
+
+# Created once per process; worker threads are spawned lazily on first submit.
+_TRANSCRIPTION_POOL = ThreadPoolExecutor(
+    max_workers=app.config.get('TRANSCRIPTION_WORKERS', 4),
+    thread_name_prefix='transcribe',
+    initializer=_init_transcription_worker
+)
+
+# Admission control: one slot per worker plus TRANSCRIPTION_MAX_QUEUE waiting jobs. A job holds
+# its slot from upload until it finishes; excess jobs wait in the pool's queue, and uploads
+# are only rejected once that bounded queue is full too.
+_JOB_SLOTS = threading.BoundedSemaphore(
+    app.config.get('TRANSCRIPTION_WORKERS', 4) + app.config.get('TRANSCRIPTION_MAX_QUEUE', 8)
+)
+
+def try_reserve_job_slot() -> bool:
+    """Reserves a job slot without blocking. Returns False if the workers and the queue are full."""
+    return _JOB_SLOTS.acquire(blocking=False)
+
+def release_job_slot() -> None:
+    """Releases a slot reserved by try_reserve_job_slot() that was not handed to a job."""
+    _JOB_SLOTS.release()
+
+def _app_context():
+    """Returns a context manager that reuses an active app context or pushes a new one."""
+    return nullcontext() if has_app_context() else app.app_context()
+
+def submit_transcription(job_id: str, temp_filename: str, language_code: str,
+                         api_choice: str, original_filename: str, context_prompt: str = "") -> Future:
+    """Runs a transcription job on the persistent worker pool.
+
+    The caller must hold a slot from try_reserve_job_slot(); it is released when the job ends.
+    """
+    future = _TRANSCRIPTION_POOL.submit(
+        process_transcription,
+        job_id, temp_filename, language_code, api_choice, original_filename, context_prompt
+    )
+    future.add_done_callback(lambda _f: _JOB_SLOTS.release())
+    return future
+
 # --- Helper Function for Progress Update ---
 
+# Progress messages are buffered per job and written to the DB in batches: as soon as
+# PROGRESS_FLUSH_MAX_MESSAGES are pending, or PROGRESS_FLUSH_INTERVAL seconds after the
+# first message of a batch (a timer covers quiet periods). flush_progress() forces a write.
+# Buffer and timer handling take no lock: dict.setdefault/pop and deque.append/popleft are
+# atomic under the GIL, so chunk threads append concurrently and only flushes of the same job
+# are serialised (for ordering); jobs never wait on each other. The duplicate-message count
+# is a read-modify-write, so it runs under a short per-job lock.
+PROGRESS_FLUSH_MAX_MESSAGES = 16
+PROGRESS_FLUSH_INTERVAL = 0.25 # seconds
+
+_progress_buffers: Dict[str, Deque[str]] = {} # job_id -> messages not yet in the DB
+_progress_timers: Dict[str, threading.Timer] = {} # job_id -> pending interval flush
+_progress_flush_locks: Dict[str, threading.Lock] = {} # job_id -> keeps its batches in order when flushes race
+_last_progress: Dict[str, list] = {} # job_id -> [last message, times repeated since] (consecutive duplicates are counted)
+_last_progress_locks: Dict[str, threading.Lock] = {} # job_id -> guards its _last_progress entry
+
+# Progress streams in this process wait on this condition instead of sleeping, and are woken
+# as soon as a batch of their job is in the DB. A job's version is bumped on every flush and
+# dropped after the final one (which also changes what a waiter sees).
+_progress_changed = threading.Condition()
+_progress_versions: Dict[str, int] = {} # job_id -> number of flushes so far
+
+def _notify_progress(job_id: str, final: bool = False) -> None:
+    """Wakes the progress streams of a job after its progress was written to the DB."""
+    with _progress_changed:
+        if final:
+            _progress_versions.pop(job_id, None)
+        else:
+            _progress_versions[job_id] = _progress_versions.get(job_id, 0) + 1
+        _progress_changed.notify_all()
+
+def progress_version(job_id: str) -> int:
+    """Returns the current progress version of a job (for wait_for_progress)."""
+    return _progress_versions.get(job_id, 0)
+
+def wait_for_progress(job_id: str, seen_version: int, timeout: float) -> int:
+    """Blocks until the job's progress changes in this process or timeout seconds pass.
+
+    Jobs running in another worker process never notify; callers re-read the DB after the
+    timeout anyway. Returns the version to pass on the next call.
+    """
+    with _progress_changed:
+        _progress_changed.wait_for(lambda: _progress_versions.get(job_id, 0) != seen_version, timeout)
+        return _progress_versions.get(job_id, 0)
+
+def _progress_flush_lock(job_id: str) -> threading.Lock:
+    """Returns the flush lock of a job, creating it on first use."""
+    lock = _progress_flush_locks.get(job_id)
+    if lock is None:
+        lock = _progress_flush_locks.setdefault(job_id, threading.Lock())
+    return lock
+
+def _repeated_progress_message(last: Optional[list]) -> Optional[str]:
+    """Returns the "<message> (xN)" line closing a streak of repeated messages, or None."""
+    if last is None or not last[1]:
+        return None
+    return f"{last[0]} (x{last[1] + 1})"
+
+def _last_progress_lock(job_id: str) -> threading.Lock:
+    """Returns the duplicate-tracking lock of a job, creating it on first use."""
+    lock = _last_progress_locks.get(job_id)
+    if lock is None:
+        lock = _last_progress_locks.setdefault(job_id, threading.Lock())
+    return lock
+
+def flush_progress(job_id: str, final: bool = False) -> None:
+    """Writes all buffered progress messages of a job to the DB in one update.
+
+    With final=True the job's buffer and lock are dropped as well; only use it once the
+    job can no longer report progress.
+    """
+    with _progress_flush_lock(job_id):
+        # Take the timer before draining: a message appended after this point arms a new one
+        timer = _progress_timers.pop(job_id, None)
+        if timer is not None:
+            timer.cancel()
+        pending = _progress_buffers.pop(job_id, None) if final else _progress_buffers.get(job_id)
+        if final:
+            # A repeat streak still open at the end of the job gets its count line now
+            with _last_progress_lock(job_id):
+                repeated = _repeated_progress_message(_last_progress.pop(job_id, None))
+            _last_progress_locks.pop(job_id, None)
+            if repeated is not None:
+                logging.info(f"[JOB:{job_id[:8]}] {repeated}")
+                if pending is None:
+                    pending = deque()
+                pending.append(repeated)
+        if final or pending is None:
+            # Job done (or a late timer after the final flush): forget its lock too
+            _progress_flush_locks.pop(job_id, None)
+        batch = []
+        try:
+            while pending:
+                batch.append(pending.popleft())
+        except IndexError:
+            pass
+        if batch:
+            try:
+                # Update database log (needs app context; pool workers already have one)
+                with _app_context():
+                    transcription_model.append_job_progress(job_id, batch)
+            except Exception as e:
+                # Log error updating DB progress, but don't stop the main process
+                logging.error(f"[JOB:{job_id[:8]}] Failed to update DB progress log: {e}")
+        if batch or final:
+            # The final flush runs after the job's end state is saved: wake streams even if empty
+            _notify_progress(job_id, final)
+
 def _update_progress(job_id: str, message: str, is_error: bool = False) -> None:
-    """Formats, logs (console), and saves (DB) a progress message for a job."""
+    """Logs (console) and buffers (DB) a progress message for a job."""
     short_job_id = job_id[:8]
     log_level = logging.ERROR if is_error else logging.INFO
+
+    # A message identical to the previous one (e.g. the same retry notice from several chunk
+    # threads) is counted instead of repeated; when the streak ends the log gets one
+    # "<message> (xN)" line with the total. Errors are always kept.
+    # Under the job's lock so concurrent chunk threads neither lose a count nor both close
+    # the same streak; the count line and the new message are buffered in that order.
+    with _last_progress_lock(job_id):
+        last = _last_progress.get(job_id)
+        if last is not None and not is_error and last[0] == message:
+            last[1] += 1
+            return
+        _last_progress[job_id] = [message, 0]
+        repeated = _repeated_progress_message(last)
+
+        pending = _progress_buffers.get(job_id)
+        if pending is None:
+            pending = _progress_buffers.setdefault(job_id, deque())
+        if repeated is not None:
+            pending.append(repeated)
+        pending.append(message)
+
     # Format message with prefix for CONSOLE logging
     log_message_console = f"[JOB:{short_job_id}] {message}"
 
     # Log to console/file (using the structured message)
+    if repeated is not None:
+        logging.info(f"[JOB:{short_job_id}] {repeated}")
     logging.log(log_level, log_message_console)
 
-    try:
-        # Update database log (needs app context)
-        with app.app_context():
-             # Pass the original, unmodified message string intended for the UI to the DB log
-             transcription_model.update_job_progress(job_id, message)
-    except Exception as e:
-        # Log error updating DB progress, but don't stop the main process
-        logging.error(f"[JOB:{short_job_id}] Failed to update DB progress log: {e}")
+    if len(pending) >= PROGRESS_FLUSH_MAX_MESSAGES:
+        flush_progress(job_id)
+    elif job_id not in _progress_timers:
+        timer = threading.Timer(PROGRESS_FLUSH_INTERVAL, flush_progress, args=(job_id,))
+        timer.daemon = True
+        # Only the thread whose timer lands in the dict starts it
+        if _progress_timers.setdefault(job_id, timer) is timer:
+            timer.start()
 
 # --- API Client Factory ---
 
+@lru_cache(maxsize=4)
 def get_transcription_api(api_choice: str) -> Any:
-    """Factory function to get an instance of the chosen transcription API client."""
+    """Factory function to get an instance of the chosen transcription API client.
+
+    Clients hold no per-job state and API keys are fixed at startup, so one instance per
+    api_choice is built and shared by all jobs (failed constructions are not cached).
+    """
     # This function now runs within the app context provided by process_transcription
     # API client __init__ methods will log their own initialization.
     try:
@@ -86,12 +276,12 @@ def process_transcription(job_id: str, temp_filename: str, language_code: str,
     """
     Handles audio/video transcription in the background, updating status in the database.
     For video files, extracts audio first, then processes through transcription pipeline.
-    Runs within a Flask application context.
+    Runs within a Flask application context (the pool worker's, or a fresh one).
     """
     short_job_id = job_id[:8] # For console logging
     extracted_audio_path = None  # Track extracted audio for cleanup
 
-    with app.app_context(): # Ensure access to current_app.config and models
+    with _app_context(): # Ensure access to current_app.config and models
         try:
             # Update status: Processing (model function logs the DB update)
             transcription_model.update_job_status(job_id, 'processing')
@@ -175,7 +365,9 @@ def process_transcription(job_id: str, temp_filename: str, language_code: str,
             detected_language = detected_language or language_code or 'unknown'
 
             # Finalize success in DB (model function logs the DB update)
-            # The message "Transcription successful and saved." is added inside finalize_job_success
+            # The message "Transcription successful and saved." is added inside finalize_job_success,
+            # so write out buffered messages first to keep the log in order
+            flush_progress(job_id)
             transcription_model.finalize_job_success(
                 job_id,
                 transcription_text,
@@ -190,12 +382,14 @@ def process_transcription(job_id: str, temp_filename: str, language_code: str,
             # Log error using helper - SIMPLE UI ERROR MESSAGE
             _update_progress(job_id, f"ERROR: {error_message}", is_error=True)
             # Set final error status in DB (model function logs DB action)
+            flush_progress(job_id)
             transcription_model.set_job_error(job_id, error_message)
         except OpenAIError as oae: # Specific OpenAI errors (if not caught by client)
             error_message = f"OpenAI API Error: {str(oae)}"
             # SIMPLE UI ERROR MESSAGE
             _update_progress(job_id, f"ERROR: {error_message}", is_error=True)
             # User-friendly message for DB status
+            flush_progress(job_id)
             transcription_model.set_job_error(job_id, "An error occurred with the OpenAI API.")
         # Add specific AssemblyAI error catch if library provides one, e.g., except aai.Error as aae:
         except Exception as e: # Catch-all for unexpected errors in this service layer or raised from clients
@@ -205,33 +399,41 @@ def process_transcription(job_id: str, temp_filename: str, language_code: str,
             # Log the full traceback for debugging (console only)
             logging.exception(f"[JOB:{short_job_id}] Unexpected error during transcription process")
             # User-friendly message for DB status
+            flush_progress(job_id)
             transcription_model.set_job_error(job_id, "An unexpected internal error occurred.")
         finally:
             # Cleanup temporary file (original upload - could be video or audio)
-            if os.path.exists(temp_filename):
-                try:
-                    os.remove(temp_filename)
-                    # Log cleanup success with job context (console only)
-                    logging.info(f"[JOB:{short_job_id}] Cleaned up temp upload: {os.path.basename(temp_filename)}")
-                    # Add verbose UI message for cleanup - USE FULL PATH AS REQUESTED
-                    _update_progress(job_id, f"Deleted temporary upload file: {temp_filename}")
-                except OSError as ose:
-                    # Log cleanup failure as an error with job context (console only)
-                    logging.error(f"[JOB:{short_job_id}] Error deleting temp upload file '{os.path.basename(temp_filename)}': {ose}")
-                    # Add verbose UI warning message - USE BASENAME HERE FOR BREVITY
-                    _update_progress(job_id, f"Warning: Failed to delete temporary upload file {os.path.basename(temp_filename)}.", is_error=False) # Log as warning
+            # (unlink directly instead of exists+remove: one syscall, and no race with the cleanup thread)
+            try:
+                os.unlink(temp_filename)
+                # Log cleanup success with job context (console only)
+                logging.info(f"[JOB:{short_job_id}] Cleaned up temp upload: {os.path.basename(temp_filename)}")
+                # Add verbose UI message for cleanup - USE FULL PATH AS REQUESTED
+                _update_progress(job_id, f"Deleted temporary upload file: {temp_filename}")
+            except FileNotFoundError:
+                pass # Already gone
+            except OSError as ose:
+                # Log cleanup failure as an error with job context (console only)
+                logging.error(f"[JOB:{short_job_id}] Error deleting temp upload file '{os.path.basename(temp_filename)}': {ose}")
+                # Add verbose UI warning message - USE BASENAME HERE FOR BREVITY
+                _update_progress(job_id, f"Warning: Failed to delete temporary upload file {os.path.basename(temp_filename)}.", is_error=False) # Log as warning
 
             # Cleanup extracted audio file (if video was processed)
-            if extracted_audio_path and os.path.exists(extracted_audio_path):
+            if extracted_audio_path:
                 try:
-                    os.remove(extracted_audio_path)
+                    os.unlink(extracted_audio_path)
                     # Log cleanup success with job context (console only)
                     logging.info(f"[JOB:{short_job_id}] Cleaned up extracted audio: {os.path.basename(extracted_audio_path)}")
                     # Add verbose UI message for cleanup
                     _update_progress(job_id, f"Deleted extracted audio file: {extracted_audio_path}")
+                except FileNotFoundError:
+                    pass # Already gone
                 except OSError as ose:
                     # Log cleanup failure as an error with job context (console only)
                     logging.error(f"[JOB:{short_job_id}] Error deleting extracted audio file '{os.path.basename(extracted_audio_path)}': {ose}")
                     # Add verbose UI warning message
                     _update_progress(job_id, f"Warning: Failed to delete extracted audio file {os.path.basename(extracted_audio_path)}.", is_error=False)
-            # Note: Chunk files are cleaned up within the API client's _split_and_transcribe method's finally block.
\ No newline at end of file
+            # Note: Chunk files are cleaned up within the API client's _split_and_transcribe method's finally block.
+
+            # Write out whatever is still buffered (e.g. the cleanup messages above)
+            flush_progress(job_id, final=True)
\ No newline at end of file
@@ -98,11 +98,12 @@ document.addEventListener('DOMContentLoaded', function() {
     .then(response => {
       if (!response.ok) {
         // Try to get error message from response body
-        return response.json().then(errData => {
-          throw new Error(errData.error || `Network response was not ok: ${response.statusText}`);
-        }).catch(() => {
+        return response.json().catch(() => {
           // Fallback if response body is not JSON or empty
           throw new Error(`Network response was not ok: ${response.statusText}`);
+        }).then(errData => {
+          // e.g. 429 when all transcription workers are busy
+          throw new Error(errData.error || `Network response was not ok: ${response.statusText}`);
         });
       }
       return response.json();
@@ -115,7 +116,7 @@ document.addEventListener('DOMContentLoaded', function() {
         document.getElementById('transcribeBtn').disabled = false;
         document.getElementById('progressContainer').style.display = 'none'; // Hide progress box on immediate error
       } else if (data.job_id) {
-        pollProgress(data.job_id); // Start polling if job started successfully
+        watchProgress(data.job_id); // Follow progress if job started successfully
       } else {
          // Handle unexpected successful response without job_id
          throw new Error("Received success response but no Job ID.");
@@ -491,6 +492,149 @@ function deleteTranscription(transcriptionId, transcriptionItem) {
 }
 
 
+/**
+ * Creates the handler that applies progress updates of one job to the UI.
+ * The handler takes a progress payload ({ status, progress: [...], error_message, result })
+ * whose progress array holds all messages so far, and returns true once the job is finished.
+ */
+function createProgressHandler() {
+  const progressElement = document.getElementById('progressActivity');
+  // Store the index of the last message shown to avoid repetition
+  let lastMessageIndex = -1; // Use -1 to ensure the first message (index 0) is shown
+  let jobIsFinished = false; // Flag to prevent UI updates after final state
+
+  return function(jobData) {
+    if (jobIsFinished) return true;
+
+    // Process and display new progress messages from the log
+    const progressLog = jobData.progress || []; // Use progress log from DB
+    if (progressLog.length > 0) {
+        // Iterate through messages we haven't shown yet
+        for (let i = lastMessageIndex + 1; i < progressLog.length; i++) {
+            const message = progressLog[i];
+            if (!message) continue; // Skip null/empty messages
+
+            let icon = "info_outline"; // Default icon
+
+            // Determine icon based on message content (case-insensitive)
+            const lowerMessage = message.toLowerCase();
+            if (lowerMessage.includes("silence")) icon = "blur_linear";
+            else if (lowerMessage.includes("split")) icon = "call_split";
+            // USE 'layers' ICON FOR CHUNK CREATION
+            else if (lowerMessage.includes("created") && lowerMessage.includes("chunk")) icon = "layers";
+            else if (lowerMessage.includes("extracting") && lowerMessage.includes("video")) icon = "local_movies";
+            else if (lowerMessage.includes("transcribing chunk")) icon = "record_voice_over"; // Match simplified message
+            else if (lowerMessage.includes("already transcribed")) icon = "record_voice_over"; // Match simplified message
+            else if (lowerMessage.includes("transcribing with")) icon = "record_voice_over"; // Match simplified message
+            else if (lowerMessage.includes("calling api")) icon = "cloud_upload";
+            else if (lowerMessage.includes("aggregat")) icon = "merge_type";
+            else if (lowerMessage.includes("cleaning up")) icon = "cleaning_services";
+            else if (lowerMessage.includes("successful") || lowerMessage.includes("completed")) icon = "check_circle"; // Note: We override this later for final success
+            else if (lowerMessage.includes("error") || lowerMessage.includes("failed")) icon = "error";
+            else if (lowerMessage.includes("start")) icon = "play_arrow";
+
+            // Update the UI with the current message only if job not marked finished
+            if (!jobIsFinished) {
+               progressElement.innerHTML = `<i class="material-icons left">${icon}</i> ${message}`;
+            }
+            console.log("Progress:", message); // Log progress to console as well
+        }
+        // Update the index of the last message shown
+        lastMessageIndex = progressLog.length - 1;
+    }
+
+    // Check if the job is finished based on status field
+    const isFinished = jobData.status === 'finished';
+    const isError = jobData.status === 'error';
+
+    if (isFinished || isError) {
+        jobIsFinished = true; // Set flag to stop UI updates
+        document.getElementById('transcribeBtn').disabled = false; // Re-enable button
+        document.querySelector('.progress').style.display = 'none'; // Hide indeterminate bar
+        // Keep progress container visible for final status/error
+
+        if (isFinished) {
+            // Set specific success message
+            progressElement.innerHTML = `<i class="material-icons left green-text">check_circle</i> Transcription completed successfully!`;
+
+            M.toast({html: 'Transcription completed!', classes: 'green'});
+            var contextField = document.getElementById('contextPrompt');
+            if (contextField) {
+                contextField.value = ""; // Clear context prompt on success
+                validateContextPrompt(); // Reset validation state
+            }
+            // Fetch the full record (incl. text) once; progress responses only carry its id
+            if (jobData.result) {
+               fetch('./api/transcriptions/' + jobData.result.id)
+                 .then(response => {
+                     if (!response.ok) throw new Error(`Fetching result failed: ${response.statusText}`);
+                     return response.json();
+                 })
+                 .then(record => addTranscriptionToHistory(record, true)) // Prepend the new result
+                 .catch(error => {
+                     console.error('Error fetching transcription result:', error);
+                     loadTranscriptions(); // Reload history as fallback
+                 });
+            } else {
+               // If result is missing, maybe reload history?
+               console.warn("Job finished but result data missing in progress response.");
+               loadTranscriptions(); // Reload history as fallback
+            }
+            // Hide progress box after a short delay on success
+            setTimeout(() => { document.getElementById('progressContainer').style.display = 'none'; }, 4000);
+
+        } else { // isError
+            const errorMessage = jobData.error_message || "An unknown error occurred.";
+            // Display the last progress message before the error if available
+            const lastProgress = progressLog.length > 0 ? progressLog[progressLog.length - 1] : "(No specific step logged)";
+            // Show error message clearly
+            progressElement.innerHTML = `<span class="grey-text">Last step: ${lastProgress}</span><br><i class="material-icons left red-text">error</i> Error: ${errorMessage}`;
+            M.toast({html: 'Transcription failed: ' + errorMessage, classes: 'red', displayLength: 6000}); // Show error longer
+            // Keep progress box visible on error
+        }
+    }
+
+    return jobIsFinished;
+  };
+}
+
+/**
+ * Follows the progress of a transcription job. Uses the Server-Sent Events stream when the
+ * browser supports it and falls back to polling if the stream cannot be (re)opened.
+ * @param {string} jobId - The ID of the job to follow.
+ */
+function watchProgress(jobId) {
+  if (!window.EventSource) {
+    pollProgress(jobId);
+    return;
+  }
+  const handleProgress = createProgressHandler();
+  const progressLog = []; // Events only carry new messages; keep the full log for the handler
+  let jobIsFinished = false;
+  const source = new EventSource('./api/progress/' + jobId + '/stream');
+
+  const onEvent = function(event) {
+    const jobData = JSON.parse(event.data);
+    progressLog.push(...(jobData.progress || []));
+    jobData.progress = progressLog;
+    if (handleProgress(jobData)) {
+      jobIsFinished = true;
+      source.close();
+    }
+  };
+  source.onmessage = onEvent;
+  source.addEventListener('done', onEvent);
+  source.onerror = function() {
+    // The server ends each stream after a while and the browser reconnects by itself
+    // (resuming from Last-Event-ID); only a stream that is given up on falls back to polling,
+    // e.g. when the server answers 503 because too many streams are open
+    if (!jobIsFinished && source.readyState === EventSource.CLOSED) {
+      console.warn('Progress stream unavailable, falling back to polling.');
+      pollProgress(jobId);
+    }
+  };
+}
+
 /**
  * Polls the backend for the progress of a specific transcription job.
  * Updates the UI with the latest status message.
@@ -498,9 +642,11 @@ function deleteTranscription(transcriptionId, transcriptionItem) {
  */
 function pollProgress(jobId) {
   const progressElement = document.getElementById('progressActivity');
-  // Store the index of the last message shown to avoid repetition
-  let lastMessageIndex = -1; // Use -1 to ensure the first message (index 0) is shown
-  let jobIsFinished = false; // Flag to prevent UI updates after final state
+  const handleProgress = createProgressHandler();
+  const progressLog = []; // Responses only carry new messages; keep the full log for the handler
+  let since = 0; // Cursor into the progress log ('next' from the previous response)
+  let requestPending = false; // Don't let a slow poll overlap the next one (both would use the same cursor)
+  let jobIsFinished = false; // Flag to stop polling after final state
 
   var interval = setInterval(function() {
       // If job is marked finished in UI, stop polling (safety check)
@@ -508,8 +654,10 @@ function pollProgress(jobId) {
           clearInterval(interval);
           return;
       }
+      if (requestPending) return;
+      requestPending = true;
 
-      fetch('./api/progress/' + jobId)
+      fetch('./api/progress/' + jobId + '?since=' + since)
       .then(response => {
           if (!response.ok) {
               // Handle HTTP errors during polling (like 404 Not Found)
@@ -518,87 +666,17 @@ function pollProgress(jobId) {
           return response.json();
       })
       .then(jobData => {
+          requestPending = false;
           // NOTE: jobData structure depends on the backend ./api/progress response
-          // Assuming it returns { status: '...', progress: [...], error_message: '...', result: {...} }
-
-          // Process and display new progress messages from the log
-          const progressLog = jobData.progress || []; // Use progress log from DB
-          if (progressLog.length > 0) {
-              // Iterate through messages we haven't shown yet
-              for (let i = lastMessageIndex + 1; i < progressLog.length; i++) {
-                  const message = progressLog[i];
-                  if (!message) continue; // Skip null/empty messages
-
-                  let icon = "info_outline"; // Default icon
-
-                  // Determine icon based on message content (case-insensitive)
-                  const lowerMessage = message.toLowerCase();
-                  if (lowerMessage.includes("silence")) icon = "blur_linear";
-                  else if (lowerMessage.includes("split")) icon = "call_split";
-                  // USE 'layers' ICON FOR CHUNK CREATION
-                  else if (lowerMessage.includes("created") && lowerMessage.includes("chunk")) icon = "layers";
-                  else if (lowerMessage.includes("extracting") && lowerMessage.includes("video")) icon = "local_movies";
-                  else if (lowerMessage.includes("transcribing chunk")) icon = "record_voice_over"; // Match simplified message
-                  else if (lowerMessage.includes("already transcribed")) icon = "record_voice_over"; // Match simplified message
-                  else if (lowerMessage.includes("transcribing with")) icon = "record_voice_over"; // Match simplified message
-                  else if (lowerMessage.includes("calling api")) icon = "cloud_upload";
-                  else if (lowerMessage.includes("aggregat")) icon = "merge_type";
-                  else if (lowerMessage.includes("cleaning up")) icon = "cleaning_services";
-                  else if (lowerMessage.includes("successful") || lowerMessage.includes("completed")) icon = "check_circle"; // Note: We override this later for final success
-                  else if (lowerMessage.includes("error") || lowerMessage.includes("failed")) icon = "error";
-                  else if (lowerMessage.includes("start")) icon = "play_arrow";
-
-                  // Update the UI with the current message only if job not marked finished
-                  if (!jobIsFinished) {
-                     progressElement.innerHTML = `<i class="material-icons left">${icon}</i> ${message}`;
-                  }
-                  console.log("Progress:", message); // Log progress to console as well
-              }
-              // Update the index of the last message shown
-              lastMessageIndex = progressLog.length - 1;
+          // Assuming it returns { status: '...', progress: [new messages], next: n, error_message: '...', result: {...} }
+          if (typeof jobData.next === 'number') {
+              progressLog.push(...(jobData.progress || []));
+              since = jobData.next;
+              jobData.progress = progressLog;
           }
-
-          // Check if the job is finished based on status field
-          const isFinished = jobData.status === 'finished';
-          const isError = jobData.status === 'error';
-
-          if (isFinished || isError) {
-              jobIsFinished = true; // Set flag to stop UI updates
+          if (handleProgress(jobData)) {
+              jobIsFinished = true;
               clearInterval(interval); // Stop polling
-              document.getElementById('transcribeBtn').disabled = false; // Re-enable button
-              document.querySelector('.progress').style.display = 'none'; // Hide indeterminate bar
-              // Keep progress container visible for final status/error
-
-              if (isFinished) {
-                  // Set specific success message
-                  progressElement.innerHTML = `<i class="material-icons left green-text">check_circle</i> Transcription completed successfully!`;
-
-                  M.toast({html: 'Transcription completed!', classes: 'green'});
-                  var contextField = document.getElementById('contextPrompt');
-                  if (contextField) {
-                      contextField.value = ""; // Clear context prompt on success
-                      validateContextPrompt(); // Reset validation state
-                  }
-                  // Fetch the full result data (which should be in jobData.result now)
-                  if (jobData.result) {
-                     addTranscriptionToHistory(jobData.result, true); // Prepend the new result
-                  } else {
-                     // If result is missing, maybe reload history?
-                     console.warn("Job finished but result data missing in progress response.");
-                     loadTranscriptions(); // Reload history as fallback
-                  }
-                  // Hide progress box after a short delay on success
-                  setTimeout(() => { document.getElementById('progressContainer').style.display = 'none'; }, 4000);
-
-              } else { // isError
-                  const errorMessage = jobData.error_message || "An unknown error occurred.";
-                  // Display the last progress message before the error if available
-                  const lastProgress = progressLog.length > 0 ? progressLog[progressLog.length - 1] : "(No specific step logged)";
-                  // Show error message clearly
-                  progressElement.innerHTML = `<span class="grey-text">Last step: ${lastProgress}</span><br><i class="material-icons left red-text">error</i> Error: ${errorMessage}`;
-                  M.toast({html: 'Transcription failed: ' + errorMessage, classes: 'red', displayLength: 6000}); // Show error longer
-                  // Keep progress box visible on error
-              }
           }
       })
       .catch(error => {
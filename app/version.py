@@ -1,7 +1,7 @@
-from pathlib import Path
+import os
 
 # Base application version. Update this when you cut a new release.
-__version__ = "0.1.0"
+__version__ = "0.1.1"
 
 
 def _read_build_stamp() -> str:
@@ -10,18 +10,20 @@ def _read_build_stamp() -> str:
     Returns an empty string if not available (e.g., dev environment).
     """
     try:
-        p = Path(__file__).with_name("build.txt")
-        return p.read_text(encoding="utf-8").strip()
+        with open(os.path.join(os.path.dirname(__file__), "build.txt"), "rb") as f:
+            return f.read().decode("utf-8").strip()
     except Exception:
         return ""
 
 
 __build__ = _read_build_stamp()
 
+# Both parts are fixed for the lifetime of the process, so format the display string once.
+_VERSION_STRING = f"{__version__}+{__build__}" if __build__ else __version__
+
 
 def version_string() -> str:
     """Returns a display-friendly version string.
     Example: 0.1.0+202501010930 or just 0.1.0 if no build stamp.
     """
-    return f"{__version__}+{__build__}" if __build__ else __version__
-
+    return _VERSION_STRING